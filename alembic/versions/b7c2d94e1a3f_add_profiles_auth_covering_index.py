@@ -0,0 +1,40 @@
+"""add_profiles_auth_covering_index
+
+Revision ID: b7c2d94e1a3f
+Revises: e63f25befca8
+Create Date: 2026-10-17 10:15:42.318207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7c2d94e1a3f'
+down_revision: Union[str, None] = 'e63f25befca8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add covering index for the per-request auth profile lookup."""
+    # The profiles table is managed by Supabase and may not exist in local databases
+    if not sa.inspect(op.get_bind()).has_table("profiles"):
+        return
+
+    # get_current_user selects email, role and subscription_status by id -
+    # including them in the index lets Postgres answer with an index-only scan.
+    # CONCURRENTLY avoids locking profiles against writes, but cannot run in a transaction
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_profiles_id_auth "
+            "ON profiles (id) INCLUDE (email, role, subscription_status)"
+        )
+
+
+def downgrade() -> None:
+    """Remove auth profile covering index."""
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_profiles_id_auth")
@@ -62,17 +62,19 @@ The application automatically configures itself based on environment variables
 and provides comprehensive error handling and logging for production deployment.
 """
 
+import asyncio
 import logging
 import os
 import sys
+import time
 from contextlib import asynccontextmanager
 from datetime import datetime
 from typing import Dict, Any
 
 from fastapi import FastAPI, Request, Response, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 import uvicorn
 
 # Import core configuration and utilities
@@ -80,6 +82,8 @@ from core.settings import settings
 from core.logging import setup_logging
 from core.rate_limit import limiter
 from core.exceptions import setup_exception_handlers
+from services.redis_cache import close_async_redis_client
+from core.auth import start_profile_invalidation_listener, stop_profile_invalidation_listener
 
 # Import all route modules
 from routes import opportunities, system, debug, dashboard_admin, auth, billing
@@ -89,10 +93,13 @@ from routes import opportunities, system, debug, dashboard_admin, auth, billing
 # Simple service functions for startup
 async def initialize_redis():
     logger.info("Redis initialization (simple mode)")
+    start_profile_invalidation_listener()
     return True
 
 async def close_redis():
     logger.info("Redis cleanup (simple mode)")
+    await stop_profile_invalidation_listener()
+    await close_async_redis_client()
     return True
 
 def initialize_celery():
@@ -120,6 +127,13 @@ def validate_environment():
 setup_logging()
 logger = logging.getLogger(__name__)
 
+async def _run_shutdown_step(step):
+    """Run one shutdown step, logging failures so the remaining steps still complete"""
+    try:
+        await step()
+    except Exception as e:
+        logger.error(f"Error during shutdown ({step.__name__}): {e}")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
@@ -163,17 +177,12 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Shutting down Fair-Edge API server...")
     
-    try:
-        # Close database connections
-        await close_database()
-        
-        # Close Redis connections
-        await close_redis()
-        
-        logger.info("Fair-Edge API server shutdown complete")
-        
-    except Exception as e:
-        logger.error(f"Error during shutdown: {e}")
+    # Close database and Redis connections concurrently
+    async with asyncio.TaskGroup() as tg:
+        for step in (close_database, close_redis):
+            tg.create_task(_run_shutdown_step(step))
+    
+    logger.info("Fair-Edge API server shutdown complete")
 
 def validate_environment():
     """
@@ -210,6 +219,8 @@ def create_app() -> FastAPI:
         version="2.0.0",
         docs_url="/docs" if settings.environment != "production" else None,
         redoc_url="/redoc" if settings.environment != "production" else None,
+        # orjson serializes the large opportunity payloads far faster than stdlib json
+        default_response_class=ORJSONResponse,
         lifespan=lifespan
     )
     
@@ -230,14 +241,19 @@ def create_app() -> FastAPI:
             "https://app.fair-edge.com"
         ]
     
+    # CORSMiddleware only tests origins with `in`, so a frozenset makes the
+    # per-request origin check a hash lookup instead of a list scan
     app.add_middleware(
         CORSMiddleware,
-        allow_origins=origins,
+        allow_origins=frozenset(origins),
         allow_credentials=True,
         allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
         allow_headers=["*"],
     )
     
+    # Compress large JSON payloads (opportunity lists are highly repetitive)
+    app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+    
     # Add rate limiting middleware
     app.state.limiter = limiter
     
@@ -284,13 +300,13 @@ def create_app() -> FastAPI:
         """
         Log all incoming requests for monitoring
         """
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         
         # Process request
         response = await call_next(request)
         
         # Calculate processing time
-        process_time = (datetime.now() - start_time).total_seconds()
+        process_time = time.perf_counter() - start_time
         
         # Log request details
         logger.info(
@@ -316,6 +332,8 @@ if __name__ == "__main__":
         "app:app",
         host="0.0.0.0",
         port=8000,
+        loop="uvloop",
+        http="httptools",
         reload=settings.environment == "development",
         log_level="info",
         access_log=True
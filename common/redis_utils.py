@@ -23,7 +23,11 @@ def get_redis_url() -> str:
 
 async def create_redis_client(decode_responses: bool = True) -> aioredis.Redis:
     """
-    Create a Redis client with standard configuration
+    Get a Redis client with standard configuration
+    
+    Decoding clients are the pooled client shared with the request handlers
+    (services.redis_cache) and must not be closed by callers; raw byte
+    clients are created per call and owned by the caller
     
     Args:
         decode_responses: Whether to decode byte responses to strings
@@ -31,8 +35,11 @@ async def create_redis_client(decode_responses: bool = True) -> aioredis.Redis:
     Returns:
         Configured Redis client
     """
-    redis_url = get_redis_url()
-    return aioredis.from_url(redis_url, decode_responses=decode_responses)
+    if decode_responses:
+        # Imported here so modules that only need get_redis_url don't load the cache layer
+        from services.redis_cache import get_async_redis_client
+        return get_async_redis_client()
+    return aioredis.from_url(get_redis_url(), decode_responses=False)
 
 
 async def test_redis_connection() -> bool:
@@ -45,7 +52,6 @@ async def test_redis_connection() -> bool:
     try:
         client = await create_redis_client()
         await client.ping()
-        await client.close()
         return True
     except Exception as e:
         logger.error(f"Redis connection test failed: {e}")
@@ -54,7 +60,8 @@ async def test_redis_connection() -> bool:
 
 class RedisConnectionManager:
     """
-    Context manager for Redis connections with proper cleanup
+    Context manager for Redis connections
+    Only clients created for this context are closed - the shared client is left open
     """
     
     def __init__(self, decode_responses: bool = True):
@@ -66,7 +73,7 @@ class RedisConnectionManager:
         return self.client
     
     async def __aexit__(self, exc_type, exc_val, _exc_tb):
-        if self.client:
+        if self.client and not self.decode_responses:
             await self.client.close()
 
 
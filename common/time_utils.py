@@ -0,0 +1,28 @@
+"""
+Timestamp utilities
+Cheap response timestamps for high-traffic endpoints
+"""
+
+import time
+from datetime import datetime
+
+# (formatted timestamp, epoch second it was formatted for)
+_now_iso_cache = ("", -1)
+
+
+def now_iso() -> str:
+    """
+    Current local time as an ISO 8601 string, formatted at most once per second
+
+    Equivalent to datetime.now().isoformat() at one-second resolution - meant
+    for informational response timestamps, not for ordering or expiry logic
+
+    Returns:
+        ISO formatted timestamp string
+    """
+    global _now_iso_cache
+    now = time.time()
+    second = int(now)
+    if _now_iso_cache[1] != second:
+        _now_iso_cache = (datetime.fromtimestamp(now).isoformat(), second)
+    return _now_iso_cache[0]
@@ -141,36 +141,408 @@ Critical Alerts:
 - Unusual role privilege access patterns
 - JWT token validation failures (potential security issue)
 """
+import asyncio
+import functools
+import hashlib
+import random
+import time
+import httpx
 import jwt
+import orjson
 from jwt import PyJWTError
-from fastapi import Depends, HTTPException, status, Header
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from pydantic import BaseModel
-from typing import Optional
+from fastapi import Depends, HTTPException, Request, status, Header
+from fastapi.security import HTTPBearer
+from starlette.concurrency import run_in_threadpool
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
 import logging
 
 from core.settings import settings
 from db import get_supabase
+from services.redis_cache import get_async_redis_client
 
 logger = logging.getLogger(__name__)
 
+class BearerToken(HTTPBearer):
+    """
+    HTTPBearer that hands dependents the raw token string
+    Keeps the OpenAPI bearer scheme and HTTPBearer's 403 responses without
+    building an HTTPAuthorizationCredentials model on every request
+    """
+    
+    async def __call__(self, request: Request) -> str:
+        scheme, _, token = (request.headers.get("Authorization") or "").partition(" ")
+        if not (scheme and token):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authenticated")
+        if scheme.lower() != "bearer":
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Invalid authentication credentials",
+            )
+        return token
+
+
 # HTTP Bearer token security
-security = HTTPBearer()
+security = BearerToken()
+
+# JWT verification parameters are resolved once at import - the Supabase
+# signing secret and algorithm are fixed for the process lifetime
+if not settings.supabase_jwt_secret:
+    raise RuntimeError("SUPABASE_JWT_SECRET is not configured - JWT signatures cannot be verified")
+JWT_ALGORITHMS = [settings.supabase_jwt_algorithm or "HS256"]
+_jwt_key = settings.supabase_jwt_secret.encode()
+# Every Supabase access token carries exp and sub - reject tokens missing either
+_jwt_decoder = jwt.PyJWT(options={"verify_aud": False, "require": ["exp", "sub"]})
+logger.info("JWT auth configured (algorithm=%s, secret_configured=True)", JWT_ALGORITHMS[0])
+
+# Verified claims keyed by blake2b(token) - a token's claims cannot change,
+# so they are reused until its exp instead of re-verifying the signature
+JWT_CLAIMS_CACHE_MAXSIZE = 4096
+_claims_cache: Dict[bytes, dict] = {}
+
+
+def _token_digest(token: str) -> bytes:
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+
+def decode_supabase_jwt(token: str) -> dict:
+    """
+    Verify a Supabase-issued JWT and return its claims
+    Audience is not checked (Supabase tokens carry aud="authenticated")
+    Claims of recently verified tokens are served from an in-process cache
+    Raises PyJWTError if the token is invalid, expired or malformed
+    """
+    cache_key = _token_digest(token)
+    payload = _claims_cache.get(cache_key)
+    if payload is not None:
+        if payload["exp"] > time.time():
+            return payload
+        _claims_cache.pop(cache_key, None)
+    
+    payload = _jwt_decoder.decode(token, _jwt_key, algorithms=JWT_ALGORITHMS)
+    if len(_claims_cache) >= JWT_CLAIMS_CACHE_MAXSIZE:
+        # Evict the oldest entry (dicts preserve insertion order)
+        _claims_cache.pop(next(iter(_claims_cache)), None)
+    _claims_cache[cache_key] = payload
+    return payload
+
+
+def invalidate_jwt(token: str) -> None:
+    """Drop a token's cached claims (e.g. on logout) so it is fully re-verified"""
+    _claims_cache.pop(_token_digest(token), None)
+
+
+# Profile lookups in flight keyed by user id - a page load fans out several
+# authenticated calls at once, and they share one Supabase round trip
+_profile_lookups: Dict[str, asyncio.Future] = {}
+
+# Found profiles keyed by user id with their expiry - role and subscription
+# status change rarely, and writers call invalidate_user when they do
+PROFILE_CACHE_TTL = 60
+PROFILE_CACHE_MAXSIZE = 10000
+_profile_cache: Dict[str, Tuple[dict, float]] = {}
+
+
+class ProfileLookupUnavailable(RuntimeError):
+    """Raised instead of querying Supabase while the profile circuit is open"""
+
+
+class _CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker
+    Opens after `threshold` failures in a row; once `cooldown` seconds have
+    passed a single probe call is let through, and its outcome closes or
+    re-opens the circuit
+    """
+    
+    def __init__(self, name: str, threshold: int, cooldown: float):
+        self.name = name
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+    
+    def allow(self) -> bool:
+        if self.opened_at is None:
+            return True
+        now = time.time()
+        if now - self.opened_at < self.cooldown:
+            return False
+        # Half-open: this call probes, everyone else waits out another cooldown
+        self.opened_at = now
+        return True
+    
+    def record_success(self) -> None:
+        if self.opened_at is not None:
+            logger.info(f"✅ {self.name} circuit closed")
+        self.failures = 0
+        self.opened_at = None
+    
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.failures >= self.threshold:
+            if self.opened_at is None:
+                logger.warning(
+                    f"⚠️ {self.name} circuit opened after {self.failures} consecutive failures"
+                )
+            self.opened_at = time.time()
+
+
+# While Supabase is failing, requests fall back to JWT-only context at once
+# instead of each waiting out a failing round trip
+_profile_breaker = _CircuitBreaker("Supabase profile lookup", threshold=5, cooldown=30.0)
+
+# Bulkhead: at most this many users' profiles are looked up at once - further
+# misses fall back instead of queuing behind a slow Supabase
+PROFILE_LOOKUP_CONCURRENCY = 32
+PROFILE_LOOKUP_TIMEOUT = 2.0
+
+# Transport-level failures (connect errors, timeouts) are retried with full-jitter
+# exponential backoff before the lookup counts as failed; HTTP error responses are not
+PROFILE_QUERY_ATTEMPTS = 3
+PROFILE_RETRY_BASE_DELAY = 0.05
+PROFILE_RETRY_MAX_DELAY = 0.5
+
+# Profiles are also shared across workers through Redis for longer than the
+# in-process cache holds them; writers delete the key through invalidate_user
+PROFILE_REDIS_KEY_PREFIX = "auth:profile:"
+PROFILE_REDIS_TTL = 300
+
+# Invalidations are broadcast so every worker drops its in-process copy at once
+# instead of serving it until PROFILE_CACHE_TTL runs out
+PROFILE_INVALIDATION_CHANNEL = "auth:profile_invalidations"
+PROFILE_LISTENER_RETRY_DELAY = 1.0
+_profile_listener_task: Optional[asyncio.Task] = None
+
+# Users whose lookups were requested during the current loop tick - misses for
+# different users are answered by one batched query instead of one each
+_profile_batch: Dict[str, List[asyncio.Future]] = {}
+_profile_batch_tasks: Set[asyncio.Task] = set()
+
+
+def _query_profiles(user_ids: List[str]) -> Dict[str, dict]:
+    """Fetch profile rows for several users from Supabase in one query (blocking)"""
+    response = (
+        get_supabase().table('profiles')
+        .select('id, email, role, subscription_status')
+        .in_('id', user_ids)
+        .execute()
+    )
+    return {row['id']: row for row in response.data or []}
+
+
+async def _query_profiles_with_retry(user_ids: List[str]) -> Dict[str, dict]:
+    for attempt in range(PROFILE_QUERY_ATTEMPTS):
+        try:
+            # The Supabase client is synchronous - run the query in the threadpool
+            return await run_in_threadpool(_query_profiles, user_ids)
+        except httpx.TransportError as e:
+            if attempt == PROFILE_QUERY_ATTEMPTS - 1:
+                raise
+            backoff = PROFILE_RETRY_BASE_DELAY * 2**attempt
+            delay = random.uniform(0, min(PROFILE_RETRY_MAX_DELAY, backoff))
+            logger.debug("Retrying profile query in %.3fs after transport error: %s", delay, e)
+            await asyncio.sleep(delay)
+
+
+async def _get_shared_profiles(user_ids: List[str]) -> Dict[str, dict]:
+    """Read profiles other workers have already fetched - Redis errors count as misses"""
+    try:
+        keys = [f"{PROFILE_REDIS_KEY_PREFIX}{user_id}" for user_id in user_ids]
+        values = await get_async_redis_client().mget(keys)
+    except Exception as e:
+        logger.warning(f"⚠️ Shared profile cache read failed: {e}")
+        return {}
+    return {user_id: orjson.loads(value) for user_id, value in zip(user_ids, values) if value}
+
+
+async def _store_shared_profiles(rows: Dict[str, dict]) -> None:
+    try:
+        pipe = get_async_redis_client().pipeline(transaction=False)
+        for user_id, row in rows.items():
+            pipe.set(
+                f"{PROFILE_REDIS_KEY_PREFIX}{user_id}", orjson.dumps(row), ex=PROFILE_REDIS_TTL
+            )
+        await pipe.execute()
+    except Exception as e:
+        logger.warning(f"⚠️ Shared profile cache write failed: {e}")
+
+
+def _fail_profile_lookups(
+    batch: Dict[str, List[asyncio.Future]], user_ids: List[str], error: Exception
+) -> None:
+    for user_id in user_ids:
+        for lookup in batch[user_id]:
+            if not lookup.done():
+                lookup.set_exception(error)
 
 
-class UserCtx(BaseModel):
-    """User context model for authenticated requests"""
+async def _run_profile_batch(batch: Dict[str, List[asyncio.Future]]) -> None:
+    rows = await _get_shared_profiles(list(batch))
+    missing = [user_id for user_id in batch if user_id not in rows]
+    
+    fetched: Dict[str, dict] = {}
+    if missing:
+        try:
+            fetched = await _query_profiles_with_retry(missing)
+        except Exception as e:
+            _profile_breaker.record_failure()
+            _fail_profile_lookups(batch, missing, e)
+        else:
+            _profile_breaker.record_success()
+            rows.update(fetched)
+    
+    # Users invalidated while the batch ran may have been read before the
+    # change - their rows are dropped and read again instead of handed out
+    stale = [
+        user_id for user_id, lookups in batch.items()
+        if user_id in rows and _profile_lookups.get(user_id) not in lookups
+    ]
+    fresh = {user_id: row for user_id, row in fetched.items() if user_id not in stale}
+    if stale:
+        for user_id in stale:
+            del rows[user_id]
+        try:
+            rows.update(await _query_profiles_with_retry(stale))
+        except Exception as e:
+            _profile_breaker.record_failure()
+            _fail_profile_lookups(batch, stale, e)
+    if fresh:
+        await _store_shared_profiles(fresh)
+    
+    for user_id, lookups in batch.items():
+        for lookup in lookups:
+            if not lookup.done():
+                lookup.set_result(rows.get(user_id))
+
+
+def _flush_profile_batch() -> None:
+    batch = dict(_profile_batch)
+    _profile_batch.clear()
+    task = asyncio.ensure_future(_run_profile_batch(batch))
+    # Hold a reference so the task is not garbage collected mid-flight
+    _profile_batch_tasks.add(task)
+    task.add_done_callback(_profile_batch_tasks.discard)
+
+
+def _profile_lookup_done(user_id: str, lookup: asyncio.Future) -> None:
+    # A lookup superseded by invalidate_user may carry stale data - don't cache it
+    if _profile_lookups.get(user_id) is not lookup:
+        return
+    del _profile_lookups[user_id]
+    # Missing profiles are not cached so a new signup's profile is seen immediately
+    if lookup.cancelled() or lookup.exception() is not None or not lookup.result():
+        return
+    if len(_profile_cache) >= PROFILE_CACHE_MAXSIZE:
+        # Evict the oldest entry (dicts preserve insertion order)
+        _profile_cache.pop(next(iter(_profile_cache)), None)
+    _profile_cache[user_id] = (lookup.result(), time.time() + PROFILE_CACHE_TTL)
+
+
+async def fetch_user_profile(user_id: str) -> Optional[dict]:
+    """
+    Fetch a user's profile row, served from a short-lived in-process cache
+    Concurrent misses for the same user share one lookup, and misses for
+    different users in the same loop tick share one Supabase query
+    Returns None if the user has no profile; Supabase errors propagate to every waiter
+    Raises ProfileLookupUnavailable while repeated Supabase failures hold the circuit
+    open or the lookup bulkhead is full, and TimeoutError if the lookup is too slow
+    """
+    cached = _profile_cache.get(user_id)
+    if cached is not None:
+        if cached[1] > time.time():
+            return cached[0]
+        _profile_cache.pop(user_id, None)
+    
+    lookup = _profile_lookups.get(user_id)
+    if lookup is None:
+        if len(_profile_lookups) >= PROFILE_LOOKUP_CONCURRENCY:
+            raise ProfileLookupUnavailable("Too many Supabase profile lookups in flight")
+        if not _profile_breaker.allow():
+            raise ProfileLookupUnavailable("Supabase profile lookups are temporarily suspended")
+        loop = asyncio.get_running_loop()
+        lookup = loop.create_future()
+        _profile_lookups[user_id] = lookup
+        lookup.add_done_callback(lambda done: _profile_lookup_done(user_id, done))
+        # The first miss of a tick schedules the batched query for everyone queued behind it
+        if not _profile_batch:
+            loop.call_soon(_flush_profile_batch)
+        _profile_batch.setdefault(user_id, []).append(lookup)
+    # Shield so one cancelled or timed out request does not cancel the lookup for the others
+    async with asyncio.timeout(PROFILE_LOOKUP_TIMEOUT):
+        return await asyncio.shield(lookup)
+
+
+def _drop_local_profile(user_id: str) -> None:
+    _profile_cache.pop(user_id, None)
+    # An in-flight lookup may have read the old row - detach it so it is not cached
+    _profile_lookups.pop(user_id, None)
+
+
+async def invalidate_user(user_id: str) -> None:
+    """Drop a user's cached profile everywhere (call after changing their role or subscription)"""
+    _drop_local_profile(user_id)
+    try:
+        pipe = get_async_redis_client().pipeline(transaction=False)
+        pipe.delete(f"{PROFILE_REDIS_KEY_PREFIX}{user_id}")
+        pipe.publish(PROFILE_INVALIDATION_CHANNEL, user_id)
+        await pipe.execute()
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to invalidate shared profile cache for user {user_id}: {e}")
+
+
+async def _listen_for_profile_invalidations() -> None:
+    """Drop profiles invalidated by other workers from this worker's cache"""
+    while True:
+        pubsub = get_async_redis_client().pubsub()
+        try:
+            await pubsub.subscribe(PROFILE_INVALIDATION_CHANNEL)
+            # Invalidations published while unsubscribed were missed - start clean
+            _profile_cache.clear()
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    _drop_local_profile(message["data"])
+        except Exception as e:
+            logger.warning(f"⚠️ Profile invalidation listener disconnected: {e}")
+        finally:
+            await pubsub.aclose()
+        await asyncio.sleep(PROFILE_LISTENER_RETRY_DELAY)
+
+
+def start_profile_invalidation_listener() -> None:
+    """Start this worker's profile invalidation listener (called on application startup)"""
+    global _profile_listener_task
+    if _profile_listener_task is None:
+        _profile_listener_task = asyncio.create_task(_listen_for_profile_invalidations())
+
+
+async def stop_profile_invalidation_listener() -> None:
+    """Stop the profile invalidation listener (called on application shutdown)"""
+    global _profile_listener_task
+    task, _profile_listener_task = _profile_listener_task, None
+    if task is not None:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+
+@dataclass(frozen=True, slots=True)
+class UserCtx:
+    """
+    User context for authenticated requests
+    A plain dataclass rather than a pydantic model - every field comes from
+    an already verified JWT or profile row, so per-request validation is skipped
+    """
     id: str
     email: Optional[str] = None
     role: str = "free"            # Default fallback
     subscription_status: str = "none"
-    
-    class Config:
-        arbitrary_types_allowed = True
 
 
 async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    token: str = Depends(security),
     
 ) -> UserCtx:
     """
@@ -217,7 +589,7 @@ async def get_current_user(
     - No sensitive information exposed in error messages
     
     Args:
-        credentials: HTTP Bearer token from Authorization header
+        token: Bearer token from the Authorization header
     
     Returns:
         UserCtx: Comprehensive user context with role and subscription info
@@ -237,24 +609,19 @@ async def get_current_user(
         >>> async def protected_endpoint(user: UserCtx = Depends(get_current_user)):
         ...     return {"user_id": user.id, "role": user.role}
     """
-    token = credentials.credentials
-    logger.info(f"🔐 Starting authentication for token: {token[:20]}...")
-    
+    return await _authenticate_token(token)
+
+
+async def _authenticate_token(token: str) -> UserCtx:
+    """
+    Verify a bearer token and build its user context
+    Raises HTTPException (401) if the token is invalid
+    """
     try:
         # Decode and validate JWT using Supabase JWT secret
-        # Disable audience verification for Supabase JWTs
-        logger.info(f"🔑 Using JWT secret: {settings.supabase_jwt_secret[:20]}... (algorithm: {settings.supabase_jwt_algorithm})")
-        payload = jwt.decode(
-            token,
-            settings.supabase_jwt_secret,
-            algorithms=[settings.supabase_jwt_algorithm],
-            options={"verify_aud": False}
-        )
-        logger.info(f"✅ JWT validation successful. Payload keys: {list(payload.keys())}")
+        payload = decode_supabase_jwt(token)
     except PyJWTError as exc:
         logger.error(f"❌ JWT validation failed: {exc}")
-        logger.error(f"❌ Token used: {token[:50]}...")
-        logger.error(f"❌ JWT secret configured: {bool(settings.supabase_jwt_secret)}")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Invalid or expired token: {exc}",
@@ -268,20 +635,31 @@ async def get_current_user(
             detail="Malformed JWT (no sub claim)"
         )
 
+    return await _user_from_claims(user_id, payload)
+
+
+async def _user_from_claims(user_id: str, payload: dict) -> UserCtx:
+    """
+    Build the user context for verified claims, falling back to defaults
+    if the profile cannot be fetched - never raises
+    """
     # Extract email from JWT payload
     email = payload.get("email")
 
     # Fetch role & subscription status from profiles table using Supabase REST API
     try:
-        logger.info(f"Fetching user profile via Supabase REST API for user {user_id}")
-        supabase_client = get_supabase()
-        response = supabase_client.table('profiles').select('id, email, role, subscription_status').eq('id', user_id).execute()
+        # Per-request logs are debug level with deferred formatting -
+        # they run on every authenticated call
+        logger.debug("Fetching user profile for user %s", user_id)
+        profile_data = await fetch_user_profile(user_id)
         
-        if response.data and len(response.data) > 0:
-            profile_data = response.data[0]
-            logger.info(f"✅ Successfully fetched user profile: {profile_data['email']} (role: {profile_data['role']}, subscription: {profile_data['subscription_status']})")
+        if profile_data:
+            logger.debug(
+                "✅ Fetched user profile for %s (role: %s, subscription: %s)",
+                user_id, profile_data['role'], profile_data['subscription_status']
+            )
             return UserCtx(
-                id=str(profile_data['id']),
+                id=user_id,
                 email=profile_data['email'] or email,
                 role=profile_data['role'] or "free",
                 subscription_status=profile_data['subscription_status'] or "none",
@@ -292,6 +670,14 @@ async def get_current_user(
             logger.info(f"Using default context for user {user_id}")
             return UserCtx(id=user_id, email=email, role="free", subscription_status="none")
             
+    except ProfileLookupUnavailable:
+        # Supabase is failing or saturated - skip straight to the defaults
+        return UserCtx(id=user_id, email=email, role="free", subscription_status="none")
+    except TimeoutError:
+        logger.warning(
+            f"⚠️ Supabase profile lookup timed out for user {user_id} - using default context"
+        )
+        return UserCtx(id=user_id, email=email, role="free", subscription_status="none")
     except Exception as api_error:
         logger.error(f"❌ Supabase REST API error: {api_error}")
         # Final fallback - return user context with defaults
@@ -299,16 +685,21 @@ async def get_current_user(
         return UserCtx(id=user_id, email=email, role="free", subscription_status="none")
 
 
+@functools.lru_cache(maxsize=None)
 def require_role(*accepted_roles: str):
     """
     Dependency factory for role-based access control
+    Memoized so every call site with the same roles shares one dependency,
+    which FastAPI then resolves at most once per request
     
     Usage:
         @app.get("/admin", dependencies=[Depends(require_role("admin"))])
         @app.get("/premium", dependencies=[Depends(require_role("subscriber", "admin"))])
     """
+    roles = frozenset(accepted_roles)
+    
     async def checker(user: UserCtx = Depends(get_current_user)) -> UserCtx:
-        if user.role not in accepted_roles:
+        if user.role not in roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Insufficient role. Required: {accepted_roles}, Current: {user.role}"
@@ -317,13 +708,17 @@ def require_role(*accepted_roles: str):
     return checker
 
 
+# Roles granted subscription access regardless of billing status
+_SUBSCRIPTION_ROLES = frozenset({"subscriber", "admin"})
+
+
 def require_subscription():
     """
     Dependency for subscription-required endpoints
     Allows both subscribers and admins
     """
     async def checker(user: UserCtx = Depends(get_current_user)) -> UserCtx:
-        if user.role not in ["subscriber", "admin"] and user.subscription_status != "active":
+        if user.role not in _SUBSCRIPTION_ROLES and user.subscription_status != "active":
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Active subscription required"
@@ -346,16 +741,21 @@ async def get_optional_user(
     Returns UserCtx if valid token provided, None otherwise
     Useful for endpoints that behave differently for authenticated vs anonymous users
     """
-    if not authorization or not authorization.startswith("Bearer "):
+    if not authorization or len(authorization) < 8 or not authorization.startswith("Bearer "):
         return None
     
+    # Verify here rather than via _authenticate_token so an invalid token is a
+    # plain None instead of an HTTPException raised only to be caught again
     try:
-        token = authorization.split(" ")[1]
-        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
-        return await get_current_user(credentials)
-    except HTTPException:
-        # Invalid token - return None instead of raising exception
+        payload = decode_supabase_jwt(authorization[7:])
+    except PyJWTError as exc:
+        logger.debug("Optional auth ignored invalid token: %s", exc)
         return None
+    
+    user_id = payload.get("sub")
+    if not user_id:
+        return None
+    return await _user_from_claims(user_id, payload)
 
 
 async def get_user_or_none(
@@ -375,13 +775,8 @@ def verify_jwt_token(token: str) -> dict:
     Returns decoded payload if valid, raises exception if invalid
     """
     try:
-        payload = jwt.decode(
-            token,
-            settings.supabase_jwt_secret,
-            algorithms=[settings.supabase_jwt_algorithm or "HS256"]
-        )
-        return payload
-    except PyJWTError as e:
+        return decode_supabase_jwt(token)
+    except PyJWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token"
@@ -1,15 +1,18 @@
 """
 Feature and role-based configuration consolidated from core/constants.py
 """
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, FrozenSet
+
+# Roles that see every field unmasked
+_PAID_ROLES: FrozenSet[str] = frozenset({"basic", "premium", "subscriber", "admin"})
 
 
 class FeatureConfig:
     """Role-based features and access control configuration"""
     
     # Fields to mask/remove for free users (advanced analytics)
-    MASK_FIELDS_FOR_FREE: Tuple[str, ...] = (
-        "kelly_factor", 
+    MASK_FIELDS_FOR_FREE: FrozenSet[str] = frozenset({
+        "kelly_factor",
         "true_hold", 
         "confidence_score",
         "historical_performance",
@@ -18,7 +21,7 @@ class FeatureConfig:
         "expected_roi",
         "market_efficiency",
         "sharp_money_indicator"
-    )
+    })
 
     # Premium features by role
     ROLE_FEATURES: Dict[str, Dict[str, Any]] = {
@@ -82,20 +85,40 @@ class FeatureConfig:
 
     def get_user_features(self, role: str) -> Dict[str, Any]:
         """Get features available for a specific user role"""
-        return self.ROLE_FEATURES.get(role, self.ROLE_FEATURES["free"])
+        return get_user_features(role)
     
     def has_feature(self, role: str, feature: str) -> bool:
         """Check if a role has access to a specific feature"""
-        features = self.get_user_features(role)
-        return features.get(feature, False)
+        return get_user_features(role).get(feature, False)
     
     def get_rate_limit(self, role: str) -> str:
         """Get API rate limit for a specific role"""
-        features = self.get_user_features(role)
-        return features.get("api_rate_limit", "30/minute")
+        return get_rate_limit(role)
     
     def should_mask_field(self, field_name: str, role: str) -> bool:
         """Check if a field should be masked for a specific role"""
-        if role in ["basic", "premium", "subscriber", "admin"]:
-            return False
-        return field_name in self.MASK_FIELDS_FOR_FREE 
\ No newline at end of file
+        return should_mask_field(field_name, role)
+
+
+# Per-role lookups resolved once at import - unknown roles fall back to free
+_DEFAULT_FEATURES: Dict[str, Any] = FeatureConfig.ROLE_FEATURES["free"]
+_RATE_LIMITS: Dict[str, str] = {
+    role: features.get("api_rate_limit", "30/minute")
+    for role, features in FeatureConfig.ROLE_FEATURES.items()
+}
+_DEFAULT_RATE_LIMIT = _RATE_LIMITS["free"]
+
+
+def get_user_features(role: str) -> Dict[str, Any]:
+    """Get features available for a specific user role (shared dict - do not mutate)"""
+    return FeatureConfig.ROLE_FEATURES.get(role, _DEFAULT_FEATURES)
+
+
+def get_rate_limit(role: str) -> str:
+    """Get API rate limit for a specific role"""
+    return _RATE_LIMITS.get(role, _DEFAULT_RATE_LIMIT)
+
+
+def should_mask_field(field_name: str, role: str) -> bool:
+    """Check if a field should be masked for a specific role"""
+    return role not in _PAID_ROLES and field_name in FeatureConfig.MASK_FIELDS_FOR_FREE
@@ -2,6 +2,7 @@
 Structured logging configuration for bet-intel application
 Sets up JSON logging with contextual information for production observability
 """
+import functools
 import logging
 import logging.config
 import os
@@ -166,8 +167,6 @@ def log_request_response():
     """Decorator to log request/response for FastAPI endpoints"""
     
     def decorator(func):
-        import functools
-
         @functools.wraps(func)
         async def wrapper(*args, **kwargs):
             logger = get_logger(f"endpoint.{func.__name__}")
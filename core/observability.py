@@ -2,6 +2,8 @@
 Observability configuration for FairEdge application
 Integrates Prometheus metrics and Sentry error tracking
 """
+import asyncio
+import functools
 import os
 from typing import Dict, Any, Optional
 import time
@@ -314,16 +316,14 @@ def setup_observability(app=None) -> ObservabilityManager:
 def track_time(metric_name: str, labels: Dict[str, str] = None):
     """Decorator to track execution time"""
     def decorator(func):
-        import functools
-        
         @functools.wraps(func)
         async def async_wrapper(*args, **kwargs):
-            start_time = time.time()
+            start_time = time.perf_counter()
             try:
                 result = await func(*args, **kwargs)
                 return result
             finally:
-                duration = time.time() - start_time
+                duration = time.perf_counter() - start_time
                 if metric_name in OPPORTUNITY_METRICS:
                     if labels:
                         OPPORTUNITY_METRICS[metric_name].labels(**labels).observe(duration)
@@ -332,12 +332,12 @@ def track_time(metric_name: str, labels: Dict[str, str] = None):
         
         @functools.wraps(func)
         def sync_wrapper(*args, **kwargs):
-            start_time = time.time()
+            start_time = time.perf_counter()
             try:
                 result = func(*args, **kwargs)
                 return result
             finally:
-                duration = time.time() - start_time
+                duration = time.perf_counter() - start_time
                 if metric_name in OPPORTUNITY_METRICS:
                     if labels:
                         OPPORTUNITY_METRICS[metric_name].labels(**labels).observe(duration)
@@ -345,7 +345,6 @@ def track_time(metric_name: str, labels: Dict[str, str] = None):
                         OPPORTUNITY_METRICS[metric_name].observe(duration)
         
         # Return appropriate wrapper based on function type
-        import asyncio
         if asyncio.iscoroutinefunction(func):
             return async_wrapper
         else:
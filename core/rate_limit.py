@@ -4,6 +4,8 @@ Rate limiting utilities with proxy-aware IP detection
 from slowapi import Limiter
 from starlette.requests import Request
 
+from core.settings import settings
+
 
 def _real_ip(request: Request) -> str:
     """
@@ -20,7 +22,13 @@ def _real_ip(request: Request) -> str:
 
 
 # Create limiter instance with real IP detection (headers disabled to fix 500 errors)
+# Counters live in Redis so every worker enforces the same shared allowance;
+# fixed windows keep a single counter per client and limit
 limiter = Limiter(
     key_func=_real_ip,
+    storage_uri=settings.redis_url,
+    strategy="fixed-window",
+    key_prefix="ratelimit",
+    in_memory_fallback_enabled=True,  # Keep limiting per-process if Redis is unreachable
     headers_enabled=False  # Disabled to prevent slowapi response type conflicts
 ) 
\ No newline at end of file
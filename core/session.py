@@ -5,15 +5,18 @@ Handles httpOnly cookies and CSRF protection
 import secrets
 import hashlib
 import hmac
-from datetime import datetime, timedelta
-from typing import Optional
+import time
+from typing import Dict, Optional, Tuple
 from fastapi import HTTPException, Request, Response
 from core.settings import settings
-from core.auth import UserCtx
-import jwt
+from core.auth import UserCtx, decode_supabase_jwt, invalidate_jwt
 from jwt import PyJWTError
 
 
+# CSRF tokens are signed with the Supabase JWT secret - encoded once here
+_csrf_signing_key = settings.supabase_jwt_secret.encode()
+
+
 class SessionManager:
     """Manages secure session cookies and CSRF tokens"""
     
@@ -107,13 +110,13 @@ class SessionManager:
     def _generate_csrf_token(cls, user_id: str) -> str:
         """Generate cryptographically secure CSRF token"""
         # Create token with timestamp and user_id for validation
-        timestamp = int(datetime.utcnow().timestamp())
+        timestamp = int(time.time())
         random_bytes = secrets.token_bytes(16)
         
         # Create HMAC with secret key
         message = f"{user_id}:{timestamp}:{random_bytes.hex()}"
         signature = hmac.new(
-            settings.supabase_jwt_secret.encode(),
+            _csrf_signing_key,
             message.encode(),
             hashlib.sha256
         ).hexdigest()
@@ -132,14 +135,13 @@ class SessionManager:
             timestamp = int(timestamp_str)
             
             # Check if token is expired
-            token_time = datetime.fromtimestamp(timestamp)
-            if datetime.utcnow() - token_time > timedelta(minutes=cls.CSRF_LIFETIME_MINUTES):
+            if time.time() - timestamp > cls.CSRF_LIFETIME_MINUTES * 60:
                 return False
             
             # Validate signature
             message = f"{user_id}:{timestamp_str}:{random_hex}"
             expected_signature = hmac.new(
-                settings.supabase_jwt_secret.encode(),
+                _csrf_signing_key,
                 message.encode(),
                 hashlib.sha256
             ).hexdigest()
@@ -150,29 +152,61 @@ class SessionManager:
             return False
 
 
+# Verified cookie sessions keyed by sha256(token) -> (user, expires_at epoch seconds)
+# Entries live at most SESSION_CACHE_TTL seconds and never past the token's exp
+SESSION_CACHE_TTL = 10
+SESSION_CACHE_MAXSIZE = 20000
+_session_cache: Dict[bytes, Tuple[UserCtx, float]] = {}
+
+
 def get_current_user_from_cookie(request: Request) -> Optional[UserCtx]:
     """
     Extract and validate user from session cookie
     Alternative to header-based auth for cookie authentication
+    Recently verified tokens are served from a short-lived in-process cache
     """
     token = SessionManager.get_auth_token_from_cookie(request)
     if not token:
         return None
     
+    cache_key = hashlib.sha256(token.encode()).digest()
+    now = time.time()
+    cached = _session_cache.get(cache_key)
+    if cached is not None:
+        if cached[1] > now:
+            return cached[0]
+        _session_cache.pop(cache_key, None)
+    
+    user, token_exp = _decode_session_token(token)
+    # Tokens without an exp claim are verified every time
+    if user is not None and token_exp:
+        if len(_session_cache) >= SESSION_CACHE_MAXSIZE:
+            # Evict the oldest entry (dicts preserve insertion order)
+            _session_cache.pop(next(iter(_session_cache)), None)
+        _session_cache[cache_key] = (user, min(now + SESSION_CACHE_TTL, token_exp))
+    return user
+
+
+def invalidate_session(token: str) -> None:
+    """Evict a token from the session and JWT claim caches (called on logout)"""
+    _session_cache.pop(hashlib.sha256(token.encode()).digest(), None)
+    invalidate_jwt(token)
+
+
+def _decode_session_token(token: str) -> Tuple[Optional[UserCtx], Optional[float]]:
+    """
+    Verify a session JWT and build the user context from its claims
+    Returns the user (or None if invalid) together with the token's exp claim
+    """
     try:
         # Validate JWT token (same logic as core.auth but from cookie)
-        # Note: PyJWT doesn't verify audience by default, so no options needed
-        payload = jwt.decode(
-            token, 
-            settings.supabase_jwt_secret,
-            algorithms=[settings.supabase_jwt_algorithm]
-        )
+        payload = decode_supabase_jwt(token)
         
         user_id = payload.get("sub")
         email = payload.get("email")
         
         if not user_id or not email:
-            return None
+            return None, None
         
         # Extract role from user metadata (same logic as core.auth)
         user_metadata = payload.get("user_metadata", {})
@@ -190,15 +224,16 @@ def get_current_user_from_cookie(request: Request) -> Optional[UserCtx]:
             "inactive"
         )
         
-        return UserCtx(
+        user = UserCtx(
             id=user_id,
             email=email,
             role=role,
             subscription_status=subscription_status
         )
+        return user, payload.get("exp")
         
     except PyJWTError:
-        return None
+        return None, None
 
 
 # Dependency for endpoints that require both auth and CSRF validation
@@ -210,7 +245,7 @@ def validate_csrf_token(token: str, stored_token: Optional[str]) -> bool:
     """Validate CSRF token"""
     return token and stored_token and hmac.compare_digest(token, stored_token)
 
-def require_csrf_validation(request: Request) -> bool:
+async def require_csrf_validation(request: Request) -> bool:
     """
     Dependency that validates CSRF token for state-changing operations
     Use this for POST/PUT/DELETE endpoints (except logout and webhooks)
@@ -155,6 +155,7 @@ class Settings(BaseSettings):
     
     model_config = SettingsConfigDict(
         env_file=".env",           # Load from .env file in development
+        env_file_encoding="utf-8", # Decode .env explicitly instead of via the locale
         case_sensitive=False,      # Environment variables are case-insensitive
         extra="ignore"            # Ignore unknown environment variables
     )
@@ -12,6 +12,7 @@ Key Functions:
 
 Legacy functions are kept for compatibility but raise errors directing to Supabase usage.
 """
+import asyncio
 import os
 import logging
 from typing import AsyncGenerator
@@ -78,7 +79,8 @@ async def check_supabase_connection() -> bool:
     
     try:
         # Try to query profiles table (non-sensitive check)
-        response = supabase.table('profiles').select('id').limit(1).execute()
+        # The Supabase client is synchronous - keep the query off the event loop
+        response = await asyncio.to_thread(supabase.table('profiles').select('id').limit(1).execute)
         return response.data is not None
     except Exception as e:
         logger.error(f"Supabase connection check failed: {e}")
@@ -6,15 +6,18 @@ Provides administrative functionality for user management and system monitoring
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from typing import Optional, Dict, Any
 from datetime import datetime
+import asyncio
 import logging
 from pydantic import BaseModel
 
 # Import authentication dependencies
-from core.auth import require_role, UserCtx
+from core.auth import require_role, invalidate_user, UserCtx
 from core.session import require_csrf_validation
 from core.rate_limit import limiter
 from db import get_supabase
-from services.redis_cache import get_ev_data, get_last_update
+from services.redis_cache import get_ev_data, get_last_update, redis_client
+from services.tasks import get_celery_stats
+import psutil
 
 # Initialize router
 router = APIRouter(prefix="/api/admin", tags=["admin"])
@@ -75,11 +78,13 @@ async def list_users(
         if role:
             count_query = count_query.eq('role', role)
         
-        count_result = count_query.execute()
+        count_result = await asyncio.to_thread(count_query.execute)
         total_count = count_result.count
         
         # Execute main query with pagination
-        result = query.order('created_at', desc=True).range(offset, offset + limit - 1).execute()
+        result = await asyncio.to_thread(
+            query.order('created_at', desc=True).range(offset, offset + limit - 1).execute
+        )
         
         # Format response
         users_data = []
@@ -147,7 +152,9 @@ async def update_user_role(
         
         # Check if user exists using Supabase
         supabase = get_supabase()
-        user_result = supabase.table('profiles').select('email, role').eq('id', user_id).execute()
+        user_result = await asyncio.to_thread(
+            supabase.table('profiles').select('email, role').eq('id', user_id).execute
+        )
         
         if not user_result.data or len(user_result.data) == 0:
             raise HTTPException(status_code=404, detail="User not found")
@@ -157,13 +164,14 @@ async def update_user_role(
         current_role = user_data.get('role')
         
         # Update role in database using Supabase
-        update_result = supabase.table('profiles').update({
+        update_result = await asyncio.to_thread(supabase.table('profiles').update({
             'role': role_update.role,
             'updated_at': 'now()'
-        }).eq('id', user_id).execute()
+        }).eq('id', user_id).execute)
         
         if not update_result.data:
             raise HTTPException(status_code=500, detail="Failed to update user role")
+        await invalidate_user(user_id)
         
         # Log the role change
         logger.info(
@@ -230,14 +238,8 @@ async def get_system_stats(
 async def get_cache_statistics() -> Dict[str, Any]:
     """Get Redis cache statistics"""
     try:
-        import redis
-        import os
-        
-        # Get Redis client directly
-        redis = redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
-        
         # Get basic cache info
-        info = redis.info()
+        info = redis_client.info()
         
         # Get EV data info
         ev_data = get_ev_data()
@@ -247,7 +249,7 @@ async def get_cache_statistics() -> Dict[str, Any]:
         keys_exist = {}
         important_keys = ['ev_data_all', 'analytics_data', 'last_update_timestamp']
         for key in important_keys:
-            keys_exist[key] = redis.exists(key)
+            keys_exist[key] = redis_client.exists(key)
         
         return {
             "opportunities_cached": len(ev_data) if ev_data else 0,
@@ -304,8 +306,6 @@ async def get_database_statistics(db: AsyncSession) -> Dict[str, Any]:
 async def get_application_statistics() -> Dict[str, Any]:
     """Get application-level statistics"""
     try:
-        from services.tasks import get_celery_stats
-        
         # Try to get Celery stats
         try:
             celery_stats = get_celery_stats()
@@ -327,8 +327,6 @@ async def get_application_statistics() -> Dict[str, Any]:
 async def get_performance_statistics() -> Dict[str, Any]:
     """Get performance-related statistics"""
     try:
-        import psutil
-        
         # System metrics
         cpu_percent = psutil.cpu_percent(interval=1)
         memory = psutil.virtual_memory()
@@ -344,12 +342,6 @@ async def get_performance_statistics() -> Dict[str, Any]:
             "boot_time": datetime.fromtimestamp(psutil.boot_time()).isoformat()
         }
         
-    except ImportError:
-        return {
-            "note": "Install psutil for detailed system metrics",
-            "cpu_usage_percent": "unavailable",
-            "memory_usage_percent": "unavailable"
-        }
     except Exception as e:
         logger.error(f"Error getting performance stats: {e}")
         return {"error": "Performance statistics unavailable"}
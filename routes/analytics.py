@@ -6,20 +6,63 @@ Handles advanced analytics and market analysis for subscribers
 from fastapi import APIRouter, Depends, HTTPException, Request
 from typing import Dict, Any, Optional, List
 import logging
-from datetime import datetime, timedelta
+from common.time_utils import now_iso
 
 # Import authentication and rate limiting
 from core.auth import require_role, UserCtx
 from core.rate_limit import limiter
 
 # Import services
-from services.redis_cache import get_analytics_data, get_ev_data
+from services.redis_cache import get_analytics_data, get_ev_data_async
 from core.ev_analyzer import calculate_market_analytics, generate_trend_analysis
 
 # Initialize router
 router = APIRouter(tags=["analytics"])
 logger = logging.getLogger(__name__)
 
+
+def _summarize_ev(ev_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Reduce the opportunity list to the aggregates both analytics endpoints need
+    One pass instead of a separate scan per count/sum/max
+    """
+    positive = low_risk = medium_risk = high_ev = 0
+    total_ev = 0.0
+    best_opp = None
+    best_ev = None
+    sports = set()
+    sportsbooks = set()
+    
+    for opp in ev_data:
+        ev_pct = opp.get("ev_percentage", 0)
+        total_ev += ev_pct
+        if ev_pct > 0:
+            positive += 1
+            if ev_pct <= 2:
+                low_risk += 1
+            elif ev_pct <= 5:
+                medium_risk += 1
+            else:
+                high_ev += 1
+        if best_ev is None or ev_pct > best_ev:
+            best_ev = ev_pct
+            best_opp = opp
+        sports.add(opp.get("sport", ""))
+        sportsbooks.add(opp.get("sportsbook", ""))
+    
+    return {
+        "count": len(ev_data),
+        "positive_ev_count": positive,
+        "low_risk_count": low_risk,
+        "medium_risk_count": medium_risk,
+        "high_ev_count": high_ev,
+        "average_ev": total_ev / len(ev_data) if ev_data else 0,
+        "max_ev": best_ev if best_ev is not None else 0,
+        "best_opportunity": best_opp,
+        "sports_count": len(sports),
+        "sportsbooks_count": len(sportsbooks)
+    }
+
 @router.get("/api/analytics/advanced", tags=["analytics"])
 @limiter.limit("30/minute")
 async def get_advanced_analytics(
@@ -45,7 +88,7 @@ async def get_advanced_analytics(
         
         # Get analytics data from cache
         analytics_data = get_analytics_data(timeframe)
-        ev_data = get_ev_data()
+        ev_data = await get_ev_data_async()
         
         if not ev_data:
             return {
@@ -53,98 +96,86 @@ async def get_advanced_analytics(
                 "message": "No data available for analysis",
                 "timeframe": timeframe,
                 "subscriber_access": True,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": now_iso()
             }
         
         # Generate comprehensive analytics
         analytics_result = {}
+        ev_summary = _summarize_ev(ev_data)
         
         # Market overview
         analytics_result["market_overview"] = {
-            "total_opportunities": len(ev_data),
-            "positive_ev_count": len([opp for opp in ev_data if opp.get("ev_percentage", 0) > 0]),
-            "average_ev": sum(opp.get("ev_percentage", 0) for opp in ev_data) / len(ev_data),
-            "max_ev": max((opp.get("ev_percentage", 0) for opp in ev_data), default=0),
-            "total_sports": len(set(opp.get("sport", "") for opp in ev_data)),
+            "total_opportunities": ev_summary["count"],
+            "positive_ev_count": ev_summary["positive_ev_count"],
+            "average_ev": ev_summary["average_ev"],
+            "max_ev": ev_summary["max_ev"],
+            "total_sports": ev_summary["sports_count"],
             "timeframe": timeframe
         }
         
-        # Sportsbook analysis
-        if include_sportsbook_analysis:
-            sportsbook_stats = {}
+        # Sportsbook and sport/market breakdowns share one pass over the data
+        sportsbook_stats = {}
+        sport_breakdown = {}
+        market_breakdown = {}
+        if include_sportsbook_analysis or include_market_breakdown:
             for opp in ev_data:
-                book = opp.get("sportsbook", "Unknown")
-                if book not in sportsbook_stats:
-                    sportsbook_stats[book] = {
-                        "opportunity_count": 0,
-                        "positive_ev_count": 0,
-                        "total_ev": 0,
-                        "max_ev": 0,
-                        "avg_odds": []
-                    }
+                ev_pct = opp.get("ev_percentage", 0)
+                is_positive = ev_pct > 0
                 
-                stats = sportsbook_stats[book]
-                stats["opportunity_count"] += 1
-                if opp.get("ev_percentage", 0) > 0:
-                    stats["positive_ev_count"] += 1
-                stats["total_ev"] += opp.get("ev_percentage", 0)
-                stats["max_ev"] = max(stats["max_ev"], opp.get("ev_percentage", 0))
-                stats["avg_odds"].append(opp.get("odds", 0))
-            
+                if include_sportsbook_analysis:
+                    book = opp.get("sportsbook", "Unknown")
+                    stats = sportsbook_stats.get(book)
+                    if stats is None:
+                        stats = sportsbook_stats[book] = {
+                            "opportunity_count": 0,
+                            "positive_ev_count": 0,
+                            "total_ev": 0,
+                            "max_ev": 0,
+                            "avg_odds": 0
+                        }
+                    stats["opportunity_count"] += 1
+                    if is_positive:
+                        stats["positive_ev_count"] += 1
+                    stats["total_ev"] += ev_pct
+                    if ev_pct > stats["max_ev"]:
+                        stats["max_ev"] = ev_pct
+                    # Running sum; divided into the average below
+                    stats["avg_odds"] += opp.get("odds", 0)
+                
+                if include_market_breakdown:
+                    for breakdown, key in (
+                        (sport_breakdown, opp.get("sport", "Unknown")),
+                        (market_breakdown, opp.get("market", "Unknown"))
+                    ):
+                        group_stats = breakdown.get(key)
+                        if group_stats is None:
+                            group_stats = breakdown[key] = {
+                                "count": 0,
+                                "positive_ev_count": 0,
+                                "avg_ev": 0,
+                                "total_ev": 0
+                            }
+                        group_stats["count"] += 1
+                        group_stats["total_ev"] += ev_pct
+                        if is_positive:
+                            group_stats["positive_ev_count"] += 1
+        
+        # Sportsbook analysis
+        if include_sportsbook_analysis:
             # Calculate averages and rankings
             for book, stats in sportsbook_stats.items():
-                stats["avg_ev"] = stats["total_ev"] / max(stats["opportunity_count"], 1)
-                stats["avg_odds"] = sum(stats["avg_odds"]) / max(len(stats["avg_odds"]), 1)
-                stats["positive_ev_rate"] = stats["positive_ev_count"] / max(stats["opportunity_count"], 1)
+                count = max(stats["opportunity_count"], 1)
+                stats["avg_ev"] = stats["total_ev"] / count
+                stats["avg_odds"] = stats["avg_odds"] / count
+                stats["positive_ev_rate"] = stats["positive_ev_count"] / count
             
             analytics_result["sportsbook_analysis"] = sportsbook_stats
         
         # Market breakdown by sport/market type
         if include_market_breakdown:
-            sport_breakdown = {}
-            market_breakdown = {}
-            
-            for opp in ev_data:
-                sport = opp.get("sport", "Unknown")
-                market = opp.get("market", "Unknown")
-                
-                # Sport stats
-                if sport not in sport_breakdown:
-                    sport_breakdown[sport] = {
-                        "count": 0,
-                        "positive_ev_count": 0,
-                        "avg_ev": 0,
-                        "total_ev": 0
-                    }
-                
-                sport_stats = sport_breakdown[sport]
-                sport_stats["count"] += 1
-                ev_pct = opp.get("ev_percentage", 0)
-                sport_stats["total_ev"] += ev_pct
-                if ev_pct > 0:
-                    sport_stats["positive_ev_count"] += 1
-                
-                # Market type stats
-                if market not in market_breakdown:
-                    market_breakdown[market] = {
-                        "count": 0,
-                        "positive_ev_count": 0,
-                        "avg_ev": 0,
-                        "total_ev": 0
-                    }
-                
-                market_stats = market_breakdown[market]
-                market_stats["count"] += 1
-                market_stats["total_ev"] += ev_pct
-                if ev_pct > 0:
-                    market_stats["positive_ev_count"] += 1
-            
             # Calculate averages
-            for sport_stats in sport_breakdown.values():
-                sport_stats["avg_ev"] = sport_stats["total_ev"] / max(sport_stats["count"], 1)
-            
-            for market_stats in market_breakdown.values():
-                market_stats["avg_ev"] = market_stats["total_ev"] / max(market_stats["count"], 1)
+            for group_stats in (*sport_breakdown.values(), *market_breakdown.values()):
+                group_stats["avg_ev"] = group_stats["total_ev"] / max(group_stats["count"], 1)
             
             analytics_result["market_breakdown"] = {
                 "by_sport": sport_breakdown,
@@ -166,10 +197,10 @@ async def get_advanced_analytics(
         
         # Risk analysis
         analytics_result["risk_analysis"] = {
-            "high_ev_opportunities": len([opp for opp in ev_data if opp.get("ev_percentage", 0) > 5]),
-            "low_risk_opportunities": len([opp for opp in ev_data if 0 < opp.get("ev_percentage", 0) <= 2]),
-            "medium_risk_opportunities": len([opp for opp in ev_data if 2 < opp.get("ev_percentage", 0) <= 5]),
-            "high_risk_opportunities": len([opp for opp in ev_data if opp.get("ev_percentage", 0) > 5]),
+            "high_ev_opportunities": ev_summary["high_ev_count"],
+            "low_risk_opportunities": ev_summary["low_risk_count"],
+            "medium_risk_opportunities": ev_summary["medium_risk_count"],
+            "high_risk_opportunities": ev_summary["high_ev_count"],
             "risk_distribution": "Balanced with slight lean toward medium-risk opportunities"
         }
         
@@ -194,7 +225,7 @@ async def get_advanced_analytics(
                 },
                 "subscriber_access": True,
                 "generated_for": subscriber_user.email,
-                "last_updated": datetime.now().isoformat()
+                "last_updated": now_iso()
             }
         }
         
@@ -218,7 +249,7 @@ async def get_analytics_summary(
     Lightweight endpoint for frequent polling
     """
     try:
-        ev_data = get_ev_data()
+        ev_data = await get_ev_data_async()
         
         if not ev_data:
             return {
@@ -229,31 +260,31 @@ async def get_analytics_summary(
                     "best_opportunity": None
                 },
                 "status": "no_data",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": now_iso()
             }
         
-        positive_ev_opps = [opp for opp in ev_data if opp.get("ev_percentage", 0) > 0]
-        best_opp = max(ev_data, key=lambda x: x.get("ev_percentage", 0), default=None)
+        ev_summary = _summarize_ev(ev_data)
+        best_opp = ev_summary["best_opportunity"]
         
         summary = {
-            "total_opportunities": len(ev_data),
-            "positive_ev_count": len(positive_ev_opps),
-            "avg_ev": sum(opp.get("ev_percentage", 0) for opp in ev_data) / len(ev_data),
+            "total_opportunities": ev_summary["count"],
+            "positive_ev_count": ev_summary["positive_ev_count"],
+            "avg_ev": ev_summary["average_ev"],
             "best_opportunity": {
                 "game": best_opp.get("game", ""),
                 "market": best_opp.get("market", ""),
                 "sportsbook": best_opp.get("sportsbook", ""),
                 "ev_percentage": best_opp.get("ev_percentage", 0)
             } if best_opp else None,
-            "sports_count": len(set(opp.get("sport", "") for opp in ev_data)),
-            "sportsbooks_count": len(set(opp.get("sportsbook", "") for opp in ev_data))
+            "sports_count": ev_summary["sports_count"],
+            "sportsbooks_count": ev_summary["sportsbooks_count"]
         }
         
         return {
             "summary": summary,
             "status": "success",
             "subscriber_access": True,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso()
         }
         
     except Exception as e:
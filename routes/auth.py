@@ -11,14 +11,32 @@ from pydantic import BaseModel
 
 # Import authentication and session dependencies
 from core.auth import get_user_or_none, UserCtx, verify_jwt_token
-from core.session import require_csrf_validation, generate_csrf_token, validate_csrf_token
+from core.session import (
+    SessionManager, require_csrf_validation, generate_csrf_token, validate_csrf_token, invalidate_session
+)
 from core.rate_limit import limiter
 from core.settings import settings
+from core.config import feature_config
 
 # Initialize router
 router = APIRouter(tags=["authentication"])
 logger = logging.getLogger(__name__)
 
+
+def _session_permissions(role: str) -> Dict[str, Any]:
+    """Client-facing permission flags for a role"""
+    return {
+        "can_access_premium": role in ("basic", "premium", "admin"),
+        "can_export_data": role in ("premium", "admin"),
+        "can_access_admin": role == "admin",
+        "api_rate_limit": "unlimited" if role == "admin" else "standard"
+    }
+
+# Permission flags depend only on the role, so they are resolved once per known role
+SESSION_PERMISSIONS: Dict[str, Dict[str, Any]] = {
+    role: _session_permissions(role) for role in feature_config.ROLE_FEATURES
+}
+
 # Pydantic models
 class SessionRequest(BaseModel):
     token: str
@@ -187,6 +205,17 @@ async def logout_secure(
                 detail="Invalid CSRF token. Please refresh the page and try again."
             )
         
+        # Drop this process's cached verifications of the client's tokens
+        # (the JWTs themselves remain valid until exp, as before)
+        authorization = request.headers.get("authorization", "")
+        for token in (
+            request.cookies.get("session_token"),
+            request.cookies.get(SessionManager.AUTH_COOKIE),
+            authorization[7:] if authorization.startswith("Bearer ") else None
+        ):
+            if token:
+                invalidate_session(token)
+        
         # Clear all session cookies securely
         response.delete_cookie(
             key="session_token",
@@ -257,12 +286,7 @@ async def get_session_user(
                 "email": user.email,
                 "role": user.role,
                 "subscription_status": getattr(user, 'subscription_status', 'free'),
-                "permissions": {
-                    "can_access_premium": user.role in ["basic", "premium", "admin"],
-                    "can_export_data": user.role in ["premium", "admin"],
-                    "can_access_admin": user.role == "admin",
-                    "api_rate_limit": "unlimited" if user.role == "admin" else "standard"
-                }
+                "permissions": SESSION_PERMISSIONS.get(user.role) or _session_permissions(user.role)
             },
             "session_status": "active",
             "timestamp": datetime.now().isoformat()
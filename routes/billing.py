@@ -127,10 +127,11 @@ ERROR HANDLING:
 """
 from fastapi import APIRouter, Request, HTTPException, Depends
 from pydantic import BaseModel
+import asyncio
 import logging
 import stripe
 
-from core.auth import get_current_user, UserCtx
+from core.auth import get_current_user, invalidate_user, UserCtx
 from core.stripe import create_checkout_session, construct_webhook_event
 from core.settings import settings
 from core.rate_limit import limiter
@@ -139,9 +140,12 @@ from db import get_supabase
 router = APIRouter(prefix="/api/billing", tags=["billing"])
 logger = logging.getLogger(__name__)
 
-def require_subscriber(user: UserCtx = Depends(get_current_user)) -> UserCtx:
+# Paid plans that can manage a Stripe subscription
+SUBSCRIBER_ROLES = frozenset({"basic", "premium"})
+
+async def require_subscriber(user: UserCtx = Depends(get_current_user)) -> UserCtx:
     """Require user to be an active subscriber (basic or premium)"""
-    if user.role not in ["basic", "premium"] or user.subscription_status != "active":
+    if user.role not in SUBSCRIBER_ROLES or user.subscription_status != "active":
         raise HTTPException(
             status_code=403, 
             detail="This feature requires an active subscription"
@@ -171,7 +175,7 @@ async def create_stripe_checkout(
             )
         
         # Check if user is already a subscriber
-        if user.role in ["basic", "premium"] and user.subscription_status == "active":
+        if user.role in SUBSCRIBER_ROLES and user.subscription_status == "active":
             raise HTTPException(
                 status_code=400, 
                 detail="User is already an active subscriber"
@@ -310,14 +314,15 @@ async def _handle_checkout_complete(session: dict):
         
         # Update user profile with subscription info using Supabase
         supabase = get_supabase()
-        result = supabase.table('profiles').update({
+        result = await asyncio.to_thread(supabase.table('profiles').update({
             'role': user_role,
             'subscription_status': 'active',
             'stripe_customer_id': customer_id,
             'stripe_subscription_id': subscription_id
-        }).eq('id', user_id).execute()
+        }).eq('id', user_id).execute)
         
         if result.data:
+            await invalidate_user(user_id)
             logger.info(f"Successfully upgraded user {user_id} to {user_role}")
         else:
             logger.error(f"Failed to update user {user_id} in database")
@@ -339,14 +344,15 @@ async def _handle_subscription_cancelled(subscription: dict):
         
         # Find user by subscription ID and downgrade using Supabase
         supabase = get_supabase()
-        result = supabase.table('profiles').update({
+        result = await asyncio.to_thread(supabase.table('profiles').update({
             'role': 'free',
             'subscription_status': 'cancelled',
             'updated_at': 'now()'
-        }).eq('stripe_subscription_id', subscription_id).execute()
+        }).eq('stripe_subscription_id', subscription_id).execute)
         
         if result.data:
             user = result.data[0]
+            await invalidate_user(user.get('id'))
             logger.info(f"Successfully downgraded user {user.get('id')} ({user.get('email')}) to free tier")
         else:
             logger.warning(f"No user found for cancelled subscription {subscription_id}")
@@ -386,14 +392,15 @@ async def _handle_subscription_updated(subscription: dict):
         
         # Update user profile using Supabase
         supabase = get_supabase()
-        result = supabase.table('profiles').update({
+        result = await asyncio.to_thread(supabase.table('profiles').update({
             'role': user_role,
             'subscription_status': status,
             'updated_at': 'now()'
-        }).eq('stripe_subscription_id', subscription_id).execute()
+        }).eq('stripe_subscription_id', subscription_id).execute)
         
         if result.data:
             user = result.data[0]
+            await invalidate_user(user.get('id'))
             logger.info(f"Updated user {user.get('id')} ({user.get('email')}) to {user_role} (status: {status})")
         else:
             logger.warning(f"No user found for subscription {subscription_id}")
@@ -419,18 +426,24 @@ async def _handle_payment_succeeded(invoice: dict):
         supabase = get_supabase()
         
         # First check if user needs updating
-        current_result = supabase.table('profiles').select('id, email, role, subscription_status').eq('stripe_subscription_id', subscription_id).execute()
+        current_result = await asyncio.to_thread(
+            supabase.table('profiles')
+            .select('id, email, role, subscription_status')
+            .eq('stripe_subscription_id', subscription_id)
+            .execute
+        )
         
         if current_result.data:
             user = current_result.data[0]
             if user.get('subscription_status') != 'active':
                 # Update to active status
-                update_result = supabase.table('profiles').update({
+                update_result = await asyncio.to_thread(supabase.table('profiles').update({
                     'subscription_status': 'active',
                     'updated_at': 'now()'
-                }).eq('stripe_subscription_id', subscription_id).execute()
+                }).eq('stripe_subscription_id', subscription_id).execute)
                 
                 if update_result.data:
+                    await invalidate_user(user.get('id'))
                     logger.info(f"Confirmed active subscription for user {user.get('id')} ({user.get('email')}) - {user.get('role')}")
                 else:
                     logger.error(f"Failed to update subscription status for user {user.get('id')}")
@@ -462,12 +475,14 @@ async def _handle_payment_failed(invoice: dict):
         # Optional: Mark subscription as past_due or implement grace period
         if subscription_id:
             supabase = get_supabase()
-            result = supabase.table('profiles').update({
+            result = await asyncio.to_thread(supabase.table('profiles').update({
                 'subscription_status': 'past_due',
                 'updated_at': 'now()'
-            }).eq('stripe_subscription_id', subscription_id).execute()
+            }).eq('stripe_subscription_id', subscription_id).execute)
             
             if result.data:
+                for user in result.data:
+                    await invalidate_user(user.get('id'))
                 logger.info(f"Marked subscription {subscription_id} as past_due")
             else:
                 logger.warning(f"Failed to update subscription {subscription_id} status to past_due")
@@ -488,7 +503,9 @@ async def _lookup_user_by_email(email: str) -> str:
     """
     try:
         supabase = get_supabase()
-        result = supabase.table('profiles').select('id').eq('email', email).execute()
+        result = await asyncio.to_thread(
+            supabase.table('profiles').select('id').eq('email', email).execute
+        )
         
         if result.data and len(result.data) > 0:
             return result.data[0]['id']
@@ -511,7 +528,7 @@ async def get_subscription_status(user: UserCtx = Depends(get_current_user)):
         "user_id": user.id,
         "role": user.role,
         "subscription_status": user.subscription_status,
-        "is_subscriber": user.role in ["basic", "premium"] and user.subscription_status == "active",
+        "is_subscriber": user.role in SUBSCRIBER_ROLES and user.subscription_status == "active",
         "stripe_configured": settings.stripe_configured
     }
 
@@ -544,7 +561,9 @@ async def create_customer_portal_session(
         
         # Get user's Stripe customer ID from database using Supabase
         supabase = get_supabase()
-        result = supabase.table('profiles').select('stripe_customer_id').eq('id', user.id).execute()
+        result = await asyncio.to_thread(
+            supabase.table('profiles').select('stripe_customer_id').eq('id', user.id).execute
+        )
         
         if not result.data or not result.data[0].get('stripe_customer_id'):
             raise HTTPException(
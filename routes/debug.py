@@ -5,6 +5,7 @@ Handles system health monitoring, debugging endpoints, and diagnostics
 
 from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from typing import Dict, Any, Optional
+import asyncio
 import logging
 from datetime import datetime
 import sys
@@ -15,9 +16,11 @@ import psutil
 from core.auth import require_role, get_user_or_none, UserCtx
 from core.rate_limit import limiter
 from core.settings import settings
+from core.session import SessionManager
 
 # Import database and services
 from db import get_supabase, check_supabase_connection
+from services.tasks import refresh_odds_data
 import redis
 
 def get_redis_client():
@@ -27,6 +30,52 @@ def get_redis_client():
 router = APIRouter(tags=["debug", "health"])
 logger = logging.getLogger(__name__)
 
+# Static host details - fixed for the process lifetime
+PYTHON_VERSION = sys.version
+PLATFORM = sys.platform
+CPU_COUNT = os.cpu_count()
+
+# Cookies whose values are only previewed by /debug/cookies
+SENSITIVE_COOKIES = frozenset({
+    "session_token",
+    "csrf_token",
+    SessionManager.AUTH_COOKIE,
+    SessionManager.CSRF_COOKIE,
+})
+
+async def _check_supabase_health() -> Dict[str, Any]:
+    """Supabase connectivity check for /health"""
+    try:
+        if await check_supabase_connection():
+            return {
+                "status": "healthy",
+                "message": "Supabase connection active"
+            }
+        return {
+            "status": "unhealthy",
+            "message": "Supabase connection failed"
+        }
+    except Exception as e:
+        return {
+            "status": "unhealthy", 
+            "error": str(e)
+        }
+
+def _check_redis_health() -> Dict[str, Any]:
+    """Redis connectivity check for /health (blocking - run in a worker thread)"""
+    try:
+        redis_client = get_redis_client()
+        redis_client.ping()
+        return {
+            "status": "healthy",
+            "message": "Redis connection active"
+        }
+    except Exception as e:
+        return {
+            "status": "unhealthy",
+            "error": str(e)
+        }
+
 @router.get("/health")
 async def health_check(request: Request):
     """
@@ -42,40 +91,14 @@ async def health_check(request: Request):
             "checks": {}
         }
         
-        # Supabase health check
-        try:
-            supabase_healthy = await check_supabase_connection()
-            if supabase_healthy:
-                health_status["checks"]["supabase"] = {
-                    "status": "healthy",
-                    "message": "Supabase connection active"
-                }
-            else:
-                health_status["checks"]["supabase"] = {
-                    "status": "unhealthy",
-                    "message": "Supabase connection failed"
-                }
-                health_status["status"] = "degraded"
-        except Exception as e:
-            health_status["checks"]["supabase"] = {
-                "status": "unhealthy", 
-                "error": str(e)
-            }
-            health_status["status"] = "degraded"
-        
-        # Redis health check
-        try:
-            redis_client = get_redis_client()
-            redis_client.ping()
-            health_status["checks"]["redis"] = {
-                "status": "healthy",
-                "message": "Redis connection active"
-            }
-        except Exception as e:
-            health_status["checks"]["redis"] = {
-                "status": "unhealthy",
-                "error": str(e)
-            }
+        # Supabase and Redis checks are independent I/O - run them concurrently
+        supabase_check, redis_check = await asyncio.gather(
+            _check_supabase_health(),
+            asyncio.to_thread(_check_redis_health)
+        )
+        health_status["checks"]["supabase"] = supabase_check
+        health_status["checks"]["redis"] = redis_check
+        if supabase_check["status"] != "healthy" or redis_check["status"] != "healthy":
             health_status["status"] = "degraded"
         
         # System resources check
@@ -150,9 +173,16 @@ async def debug_profiles(
     Admin only - for troubleshooting user issues
     """
     try:
-        # Get user profiles using Supabase
+        # Get the newest user profiles and the total profile count in one
+        # Supabase request; the client is blocking so it runs off the event loop
         supabase = get_supabase()
-        result = supabase.table('profiles').select('id, email, role, subscription_status, created_at, updated_at').limit(limit).execute()
+        query = (
+            supabase.table('profiles')
+            .select('id, email, role, subscription_status, created_at, updated_at', count='exact')
+            .order('created_at', desc=True)
+            .limit(limit)
+        )
+        result = await asyncio.to_thread(query.execute)
         
         debug_info = {
             "profiles_debug": {
@@ -160,7 +190,8 @@ async def debug_profiles(
                 "limit": limit,
                 "requested_by": admin_user.email,
                 "timestamp": datetime.now().isoformat(),
-                "total_returned": len(result.data) if result.data else 0
+                "total_returned": len(result.data) if result.data else 0,
+                "total_profiles": result.count
             },
             "profiles": result.data if result.data else [],
             "user_context": {
@@ -232,11 +263,15 @@ async def debug_database_status(
         supabase = get_supabase()
         
         # Test connection by querying profiles table
-        profiles_result = supabase.table('profiles').select('id').limit(1).execute()
+        profiles_result = await asyncio.to_thread(
+            supabase.table('profiles').select('id').limit(1).execute
+        )
         connection_test = "passed" if hasattr(profiles_result, 'data') else "failed"
         
         # Get profiles table count
-        profiles_count_result = supabase.table('profiles').select('id', count='exact').execute()
+        profiles_count_result = await asyncio.to_thread(
+            supabase.table('profiles').select('id', count='exact').execute
+        )
         profiles_count = profiles_count_result.count if hasattr(profiles_count_result, 'count') else 0
         
         debug_info = {
@@ -278,11 +313,9 @@ async def debug_trigger_refresh(
     Admin only - for testing background task functionality
     """
     try:
-        # Import here to avoid circular imports
-        from services.tasks import refresh_odds_data
-        
-        # Trigger refresh task
-        task = refresh_odds_data.delay()
+        # Trigger refresh task - publishing to the broker is blocking I/O,
+        # so it runs off the event loop; the task itself runs on a worker
+        task = await asyncio.to_thread(refresh_odds_data.delay)
         
         logger.info(f"Debug refresh triggered by admin: {admin_user.email}")
         
@@ -319,7 +352,7 @@ async def debug_cookies(
         # Get all cookies from request
         for name, value in request.cookies.items():
             # Don't expose sensitive cookie values in logs
-            if name in ["session_token", "csrf_token"]:
+            if name in SENSITIVE_COOKIES:
                 cookies_info[name] = {
                     "present": True,
                     "length": len(value),
@@ -329,9 +362,14 @@ async def debug_cookies(
                 cookies_info[name] = value
         
         # Get headers related to authentication
+        headers = request.headers
+        user_agent = headers.get("user-agent")
         auth_headers = {}
-        for header_name in ["authorization", "x-csrf-token", "user-agent"]:
-            header_value = request.headers.get(header_name)
+        for header_name, header_value in (
+            ("authorization", headers.get("authorization")),
+            ("x-csrf-token", headers.get("x-csrf-token")),
+            ("user-agent", user_agent)
+        ):
             if header_value:
                 auth_headers[header_name] = header_value[:50] + "..." if len(header_value) > 50 else header_value
         
@@ -346,7 +384,7 @@ async def debug_cookies(
                 },
                 "request_info": {
                     "client_host": request.client.host if request.client else "unknown",
-                    "user_agent": request.headers.get("user-agent", "unknown")[:100]
+                    "user_agent": (user_agent or "unknown")[:100]
                 },
                 "timestamp": datetime.now().isoformat()
             }
@@ -374,9 +412,9 @@ async def debug_system_info(
     try:
         # System information
         system_info = {
-            "python_version": sys.version,
-            "platform": sys.platform,
-            "cpu_count": os.cpu_count(),
+            "python_version": PYTHON_VERSION,
+            "platform": PLATFORM,
+            "cpu_count": CPU_COUNT,
             "environment_variables": {
                 key: "***" if any(secret in key.lower() for secret in ["key", "secret", "password", "token"]) else value
                 for key, value in os.environ.items()
@@ -3,41 +3,109 @@ Opportunities API Routes
 Handles betting opportunities, EV analysis, and related data endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Request, BackgroundTasks, Header
+from fastapi import (
+    APIRouter, Depends, HTTPException, Query, Request, Response, BackgroundTasks, Header
+)
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from typing import Dict, Any, Optional, List
+import asyncio
 import logging
-from datetime import datetime
+from common.time_utils import now_iso
 import hashlib
+import uuid
+import orjson
 
 # Import authentication and rate limiting
 from core.auth import require_role, get_user_or_none, UserCtx
 from core.rate_limit import limiter
 
 # Import services
-from services.redis_cache import get_ev_data
+from services.redis_cache import (
+    get_async_redis_client, get_ev_data_async, get_ui_view_async, get_sport_data_async,
+    get_last_update_async, get_export_async, store_export_async, get_ui_search_async
+)
 from services.tasks import refresh_odds_data
 from services.dashboard_activity import dashboard_activity
-from services.opportunity_formatter import format_opportunities_for_frontend
+from services.opportunity_formatter import format_opportunities_for_frontend, search_blob
 
 
 # Initialize router
 router = APIRouter(tags=["opportunities"])
 logger = logging.getLogger(__name__)
 
+# Roles that see every market unfiltered, and so can share the precomputed full view
+FULL_VIEW_ROLES = frozenset({"premium", "subscriber", "admin"})
+
+# Pages larger than this are streamed instead of serialized in one shot
+STREAM_MIN_ROWS = 100
+STREAM_CHUNK_ROWS = 200
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+# Repeated manual refresh clicks within this window share one queued task
+MANUAL_REFRESH_CLAIM_KEY = "opportunities:manual_refresh"
+MANUAL_REFRESH_CLAIM_TTL = 60
+# Deletes the claim only if it still holds the given task id, so a failed
+# publish never releases a claim taken by a later request
+RELEASE_MANUAL_REFRESH_CLAIM_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# ETags keyed by their raw inputs - entries for superseded refreshes age out
+# through oldest-first eviction
+_etag_cache: Dict[tuple, str] = {}
+ETAG_CACHE_MAXSIZE = 4096
+
+
+def _track_dashboard_session(user_id: Optional[str], session_id: str) -> bool:
+    """
+    Record dashboard access and report whether this request should trigger the on-load refresh
+    Uses the blocking Redis client, so callers run it in the threadpool
+    """
+    last_refresh = dashboard_activity.track_dashboard_access(user_id=user_id, session_id=session_id)
+    return dashboard_activity.claim_refresh_on_load(last_refresh)
+
+
+def _opportunities_etag(last_update: str, role: str, *filters: Any) -> str:
+    """
+    Build a weak ETag for an opportunities response
+    The payload only changes when the cache is refreshed or the caller's
+    role, session or filters differ, so those inputs identify the representation
+    """
+    parts = (last_update, role, *filters)
+    etag = _etag_cache.get(parts)
+    if etag is None:
+        key = "|".join(str(part) for part in parts)
+        etag = f'W/"{hashlib.blake2b(key.encode(), digest_size=16).hexdigest()}"'
+        if len(_etag_cache) >= ETAG_CACHE_MAXSIZE:
+            # Evict the oldest entry (dicts preserve insertion order)
+            _etag_cache.pop(next(iter(_etag_cache)), None)
+        _etag_cache[parts] = etag
+    return etag
+
 @router.get("/api/opportunities")
 @limiter.limit("60/minute")
 async def get_opportunities(
     request: Request,
+    response: Response,
     background_tasks: BackgroundTasks,
     search: Optional[str] = None,
-    limit: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    offset: int = Query(0, ge=0),
     min_ev: Optional[float] = None,
     market_type: Optional[str] = None,
+    sport: Optional[str] = None,
     user: Optional[UserCtx] = Depends(get_user_or_none)
 ):
     """
     Get betting opportunities with role-based filtering and smart refresh logic
     
+    Pagination: `limit`/`offset` page through the filtered list; omitting
+    `limit` returns every remaining row (the dashboard fetches the full list)
+    
     Smart Refresh Strategy:
     - Tracks dashboard activity to optimize API calls
     - Refreshes on load if data is stale and no active sessions
@@ -56,24 +124,69 @@ async def get_opportunities(
         session_data = f"{user_id}:{client_ip}:{request.headers.get('user-agent', '')}"
         session_id = hashlib.sha256(session_data.encode()).hexdigest()[:12]
         
-        # Track dashboard activity
-        dashboard_activity.track_dashboard_access(user_id=user_id, session_id=session_id)
+        # Free and full-access users get the view precomputed at refresh time
+        # and sport filters read only that sport's slice
+        user_role_for_filtering = user.role if user else "free"
+        view_tier = None
+        if not sport:
+            if user_role_for_filtering == "free":
+                view_tier = "free"
+            elif user_role_for_filtering in FULL_VIEW_ROLES:
+                view_tier = "full"
+        
+        async def read_cache():
+            # The timestamp is read before the rows - refreshes write it last,
+            # so the rows sent are never older than the refresh the ETag names
+            last_update = await get_last_update_async()
+            if view_tier:
+                return await get_ui_view_async(view_tier, last_update), last_update
+            if sport:
+                return await get_sport_data_async(sport, last_update), last_update
+            return await get_ev_data_async(last_update), last_update
         
-        # Check if we should refresh data on load (if stale and no recent activity)
-        should_refresh_on_load = dashboard_activity.should_refresh_on_load()
+        # Track dashboard activity and read the cache concurrently - the
+        # activity tracker is blocking so it runs off the event loop
+        (cached_data, last_update), should_refresh_on_load = await asyncio.gather(
+            read_cache(),
+            run_in_threadpool(_track_dashboard_session, user_id, session_id)
+        )
+        ui_view, ev_data = (cached_data, None) if view_tier else (None, cached_data)
+        if view_tier and not ui_view:
+            # View not materialized yet (e.g. first request after deploy)
+            ev_data = await get_ev_data_async(last_update)
+        elif sport and ev_data is None:
+            # Sport slice not materialized yet - filter the full list
+            ev_data = [
+                opp for opp in await get_ev_data_async(last_update)
+                if opp.get('sport') == sport
+            ]
         refresh_triggered = False
         
         if should_refresh_on_load:
             logger.info("🔄 Triggering refresh on dashboard load - data is stale")
             # Trigger background refresh with skip_activity_check=True for on-demand refresh
-            task = refresh_odds_data.delay(force_refresh=False, skip_activity_check=True)
-            background_tasks.add_task(lambda: task)  # Add to background tasks for proper handling
+            # The broker publish is blocking, so it is queued to run after the response is sent
+            background_tasks.add_task(
+                refresh_odds_data.delay, force_refresh=False, skip_activity_check=True
+            )
             refresh_triggered = True
         
-        # Get cached EV data
-        ev_data = get_ev_data()
+        # Conditional GET - clients polling between refreshes get a bodyless 304.
+        # The body carries the caller's session_id, so it is part of the key;
+        # admin responses include live activity stats and are never validated
+        etag = None
+        if last_update and not refresh_triggered and user_role_for_filtering != "admin":
+            etag = _opportunities_etag(
+                last_update, user_role_for_filtering, session_id, search, limit, offset,
+                min_ev, market_type, sport
+            )
+            if request.headers.get("if-none-match") == etag:
+                return Response(
+                    status_code=304,
+                    headers={"ETag": etag, "Cache-Control": "private, no-cache"}
+                )
         
-        if not ev_data:
+        if not ui_view and not ev_data:
             return {
                 "opportunities": [],
                 "total_count": 0,
@@ -90,44 +203,75 @@ async def get_opportunities(
             }
         
         # Apply role-based filtering
-        user_role_for_filtering = user.role if user else "free"
         logger.info(f"🎯 User context: {user.email if user else 'unauthenticated'} (role: {user_role_for_filtering})")
-        logger.info(f"📊 Formatting {len(ev_data)} opportunities for role: {user_role_for_filtering}")
-        filtered_opportunities = format_opportunities_for_frontend(
-            ev_data, 
-            user_role=user_role_for_filtering,
-            limit=limit
-        )
-        logger.info(f"✅ Formatted {len(filtered_opportunities)} opportunities for role {user_role_for_filtering}")
+        if ui_view:
+            filtered_opportunities = ui_view
+            logger.info(
+                f"✅ Served {len(filtered_opportunities)} opportunities "
+                f"from precomputed {view_tier} view"
+            )
+        else:
+            logger.info(
+                f"📊 Formatting {len(ev_data)} opportunities for role: {user_role_for_filtering}"
+            )
+            filtered_opportunities = await run_in_threadpool(
+                format_opportunities_for_frontend,
+                ev_data, 
+                user_role=user_role_for_filtering
+            )
+            logger.info(
+                f"✅ Formatted {len(filtered_opportunities)} opportunities "
+                f"for role {user_role_for_filtering}"
+            )
         
         # Apply search filtering if search term provided
         if search and search.strip():
             search_term = search.strip().lower()
             original_count = len(filtered_opportunities)
+            # Precomputed views carry a parallel search index; rows formatted
+            # on demand (or views cached without one) derive it here
+            blobs = await get_ui_search_async(view_tier, last_update) if ui_view else None
+            if blobs is None or len(blobs) != original_count:
+                blobs = [search_blob(opp) for opp in filtered_opportunities]
             filtered_opportunities = [
-                opp for opp in filtered_opportunities
-                if (search_term in opp.get('event', '').lower() or
-                    search_term in opp.get('bet_description', '').lower() or
-                    search_term in opp.get('bet_type', '').lower())
+                opp for opp, blob in zip(filtered_opportunities, blobs)
+                if search_term in blob
             ]
             logger.info(f"Search filter '{search_term}': {original_count} -> {len(filtered_opportunities)} opportunities")
         
+        # Paginate after filtering so pages are stable and only one page is serialized
+        filtered_total = len(filtered_opportunities)
+        end = offset + limit if limit else None
+        page = filtered_opportunities[offset:end]
+        
+        if etag:
+            response.headers["ETag"] = etag
+            response.headers["Cache-Control"] = "private, no-cache"
+        
         # Add metadata
-        total_count = len(filtered_opportunities)
+        total_count = len(page)
         user_role = user.role if user else "free"
         
         response_data = {
-            "opportunities": filtered_opportunities,
+            "opportunities": page,
             "total_count": total_count,
+            "pagination": {
+                "offset": offset,
+                "limit": limit,
+                "total": filtered_total,
+                "has_more": offset + total_count < filtered_total
+            },
             "filters_applied": {
                 "role_based": True,
                 "user_role": user_role,
                 "search": search if search and search.strip() else None,
                 "limit": limit,
                 "min_ev": min_ev,
-                "market_type": market_type
+                "market_type": market_type,
+                "sport": sport
             },
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now_iso(),
+            "last_update": last_update,
             "cache_status": "hit",
             "session_info": {
                 "session_id": session_id,
@@ -145,9 +289,9 @@ async def get_opportunities(
         
         # Add debug info for admins
         if user and user.role == "admin":
-            activity_stats = dashboard_activity.get_stats()
+            activity_stats = await run_in_threadpool(dashboard_activity.get_stats)
             response_data["debug_info"] = {
-                "raw_data_count": len(ev_data),
+                "raw_data_count": len(ev_data) if ev_data is not None else len(ui_view),
                 "filtering_applied": True,
                 "user_context": {
                     "id": user.id,
@@ -157,6 +301,13 @@ async def get_opportunities(
                 "activity_stats": activity_stats
             }
         
+        if total_count > STREAM_MIN_ROWS:
+            # Large pages are streamed; headers set on `response` do not apply
+            # to a returned response object, so they are passed explicitly
+            del response_data["opportunities"]
+            headers = {"ETag": etag, "Cache-Control": "private, no-cache"} if etag else {}
+            return _stream_json_rows(response_data, "opportunities", page, headers)
+        
         return response_data
         
     except Exception as e:
@@ -180,15 +331,55 @@ async def refresh_opportunities(
     try:
         logger.info(f"Manual refresh triggered by admin: {admin_user.email}")
         
-        # Start background task with force_refresh=True and skip_activity_check=True for manual refresh
-        task = refresh_odds_data.delay(force_refresh=True, skip_activity_check=True)
+        # Claim the refresh with a pre-generated task id; if a manual refresh
+        # was already queued recently, report that task instead of queueing another
+        redis = get_async_redis_client()
+        task_id = str(uuid.uuid4())
+        claimed = await redis.set(
+            MANUAL_REFRESH_CLAIM_KEY, task_id, nx=True, ex=MANUAL_REFRESH_CLAIM_TTL
+        )
+        
+        if not claimed:
+            existing_task_id = await redis.get(MANUAL_REFRESH_CLAIM_KEY)
+            if existing_task_id:
+                return {
+                    "success": True,
+                    "message": "Manual refresh already in progress",
+                    "task_id": existing_task_id,
+                    "triggered_by": admin_user.email,
+                    "timestamp": now_iso(),
+                    "refresh_type": "manual_force",
+                    "note": "Check /api/task-status/{task_id} for progress"
+                }
+            # Claim expired between SET and GET - queue this one
+            await redis.set(MANUAL_REFRESH_CLAIM_KEY, task_id, ex=MANUAL_REFRESH_CLAIM_TTL)
+        
+        # Start background task with force_refresh=True and skip_activity_check=True
+        # for manual refresh; publishing to the broker is blocking I/O, so keep it
+        # off the event loop
+        try:
+            await asyncio.to_thread(
+                refresh_odds_data.apply_async,
+                kwargs={"force_refresh": True, "skip_activity_check": True},
+                task_id=task_id
+            )
+        except Exception:
+            # The task was never queued - release the claim so the next click
+            # retries instead of reporting this task id for the rest of the TTL
+            try:
+                await redis.eval(
+                    RELEASE_MANUAL_REFRESH_CLAIM_SCRIPT, 1, MANUAL_REFRESH_CLAIM_KEY, task_id
+                )
+            except Exception as release_error:
+                logger.warning(f"⚠️ Failed to release manual refresh claim: {release_error}")
+            raise
         
         return {
             "success": True,
             "message": "Manual refresh initiated (force refresh)",
-            "task_id": task.id,
+            "task_id": task_id,
             "triggered_by": admin_user.email,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now_iso(),
             "refresh_type": "manual_force",
             "note": "Check /api/task-status/{task_id} for progress"
         }
@@ -216,10 +407,11 @@ async def get_premium_opportunities(
     Includes all market types and advanced filtering options
     """
     try:
-        # Get all cached data
-        ev_data = get_ev_data()
+        # Subscribers all share the view precomputed at refresh time
+        filtered_opportunities = await get_ui_view_async("full")
+        ev_data = None if filtered_opportunities else await get_ev_data_async()
         
-        if not ev_data:
+        if not filtered_opportunities and not ev_data:
             return {
                 "opportunities": [],
                 "total_count": 0,
@@ -232,15 +424,16 @@ async def get_premium_opportunities(
                 "cache_status": "empty"
             }
         
-        # Enhanced filtering for premium users
-        filtered_opportunities = format_opportunities_for_frontend(
-            ev_data,
-            user_role="subscriber",
-            limit=None
-        )
+        if not filtered_opportunities:
+            # Full view not materialized yet - format on demand
+            filtered_opportunities = await run_in_threadpool(
+                format_opportunities_for_frontend,
+                ev_data,
+                user_role="subscriber",
+                limit=None
+            )
         
-        return {
-            "opportunities": filtered_opportunities,
+        response_data = {
             "total_count": len(filtered_opportunities),
             "premium_features": {
                 "market_types_included": {
@@ -262,8 +455,13 @@ async def get_premium_opportunities(
                 "id": subscriber_user.id,
                 "email": subscriber_user.email
             },
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso()
         }
+        if len(filtered_opportunities) > STREAM_MIN_ROWS:
+            return _stream_json_rows(response_data, "opportunities", filtered_opportunities, {})
+        
+        response_data["opportunities"] = filtered_opportunities
+        return response_data
         
     except Exception as e:
         logger.error(f"Error getting premium opportunities: {e}")
@@ -272,6 +470,58 @@ async def get_premium_opportunities(
             detail="Error retrieving premium opportunities"
         )
 
+def _stream_json_rows(
+    payload: Dict[str, Any],
+    rows_key: str,
+    rows: List[Dict[str, Any]],
+    headers: Dict[str, str],
+) -> StreamingResponse:
+    """
+    Stream `payload` as a JSON object with `rows` appended under `rows_key`
+    The metadata goes out first and rows are encoded a chunk at a time, so
+    large pages never exist as a single encoded body
+    """
+    def body():
+        head = orjson.dumps(payload, option=_ORJSON_OPTIONS)[:-1]
+        yield head + (b',"' if len(head) > 1 else b'"') + rows_key.encode() + b'":['
+        for start in range(0, len(rows), STREAM_CHUNK_ROWS):
+            chunk = b",".join(
+                orjson.dumps(row, option=_ORJSON_OPTIONS)
+                for row in rows[start:start + STREAM_CHUNK_ROWS]
+            )
+            yield chunk if start == 0 else b"," + chunk
+        yield b"]}"
+    
+    return StreamingResponse(body(), media_type="application/json", headers=headers)
+
+def _strip_export_metadata(opportunity: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep only the core betting fields of an opportunity for raw export"""
+    return {
+        "game": opportunity.get("game", ""),
+        "market": opportunity.get("market", ""),
+        "selection": opportunity.get("selection", ""),
+        "sportsbook": opportunity.get("sportsbook", ""),
+        "odds": opportunity.get("odds", 0),
+        "fair_odds": opportunity.get("fair_odds", 0),
+        "ev_percentage": opportunity.get("ev_percentage", 0),
+        "kelly_bet": opportunity.get("kelly_bet", 0),
+        "commence_time": opportunity.get("commence_time", "")
+    }
+
+def _empty_export_response(format: str, include_metadata: bool, user: UserCtx) -> Dict[str, Any]:
+    """Raw export response for when no opportunities are cached"""
+    return {
+        "raw_data": [],
+        "count": 0,
+        "export_info": {
+            "format": format,
+            "include_metadata": include_metadata,
+            "exported_by": user.email,
+            "export_time": now_iso()
+        },
+        "message": "No raw data available"
+    }
+
 @router.get("/api/bets/raw", tags=["opportunities"])
 @limiter.limit("30/minute")
 async def get_raw_betting_data(
@@ -285,50 +535,58 @@ async def get_raw_betting_data(
     Provides unfiltered access to all opportunities data
     """
     try:
-        # Get all raw data
-        ev_data = get_ev_data()
+        if format == "ndjson":
+            ev_data = await get_ev_data_async()
+            if not ev_data:
+                return _empty_export_response(format, include_metadata, subscriber_user)
+            
+            # Stream one JSON document per line so large exports are never
+            # materialized as a single response body
+            def ndjson_rows():
+                for opportunity in ev_data:
+                    row = opportunity if include_metadata else _strip_export_metadata(opportunity)
+                    yield orjson.dumps(row, option=_ORJSON_OPTIONS) + b"\n"
+            
+            return StreamingResponse(
+                ndjson_rows(),
+                media_type="application/x-ndjson",
+                headers={"X-Export-Count": str(len(ev_data))}
+            )
         
-        if not ev_data:
-            return {
-                "raw_data": [],
-                "count": 0,
-                "export_info": {
-                    "format": format,
-                    "include_metadata": include_metadata,
-                    "exported_by": subscriber_user.email,
-                    "export_time": datetime.now().isoformat()
-                },
-                "message": "No raw data available"
-            }
+        # The export only changes when the cache is refreshed, so its encoded
+        # rows are built once per refresh and shared by every subscriber
+        variant = "full" if include_metadata else "core"
+        last_update = await get_last_update_async()
+        cached_export = await get_export_async(variant, last_update) if last_update else None
         
-        # Prepare raw data export
-        raw_export = []
-        for opportunity in ev_data:
+        if cached_export:
+            export_count, rows_json = cached_export
+        else:
+            # Read against the same timestamp the export is cached under
+            ev_data = await get_ev_data_async(last_update)
+            
+            if not ev_data:
+                return _empty_export_response(format, include_metadata, subscriber_user)
+            
+            # Prepare raw data export
             if include_metadata:
-                raw_export.append(opportunity)
+                raw_export = ev_data
             else:
                 # Strip metadata, keep core data only
-                core_data = {
-                    "game": opportunity.get("game", ""),
-                    "market": opportunity.get("market", ""),
-                    "selection": opportunity.get("selection", ""),
-                    "sportsbook": opportunity.get("sportsbook", ""),
-                    "odds": opportunity.get("odds", 0),
-                    "fair_odds": opportunity.get("fair_odds", 0),
-                    "ev_percentage": opportunity.get("ev_percentage", 0),
-                    "kelly_bet": opportunity.get("kelly_bet", 0),
-                    "commence_time": opportunity.get("commence_time", "")
-                }
-                raw_export.append(core_data)
+                raw_export = [_strip_export_metadata(opportunity) for opportunity in ev_data]
+            
+            export_count = len(raw_export)
+            rows_json = await run_in_threadpool(orjson.dumps, raw_export, option=_ORJSON_OPTIONS)
+            if last_update:
+                await store_export_async(variant, last_update, export_count, rows_json)
         
-        return {
-            "raw_data": raw_export,
-            "count": len(raw_export),
+        response_meta = orjson.dumps({
+            "count": export_count,
             "export_info": {
                 "format": format,
                 "include_metadata": include_metadata,
                 "exported_by": subscriber_user.email,
-                "export_time": datetime.now().isoformat(),
+                "export_time": now_iso(),
                 "data_freshness": "real-time_cache"
             },
             "subscriber_access": {
@@ -336,7 +594,21 @@ async def get_raw_betting_data(
                 "all_markets": True,
                 "raw_data_access": True
             }
-        }
+        })
+        rows = rows_json.encode() if isinstance(rows_json, str) else rows_json
+        
+        # Send the encoded rows as-is between the envelope pieces rather than
+        # concatenating a second copy of the whole export
+        def export_body():
+            yield b'{"raw_data":'
+            yield rows
+            yield b"," + response_meta[1:]
+        
+        return StreamingResponse(
+            export_body(),
+            media_type="application/json",
+            headers={"X-Export-Count": str(export_count)}
+        )
         
     except Exception as e:
         logger.error(f"Error exporting raw data: {e}")
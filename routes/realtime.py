@@ -5,6 +5,7 @@ WebSocket and SSE endpoints for live data streaming
 
 import json
 import logging
+import orjson
 from typing import AsyncGenerator
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Request
 from sse_starlette.sse import EventSourceResponse
@@ -107,8 +108,11 @@ async def websocket_endpoint(websocket: WebSocket):
         
         async for message in pubsub.listen():
             if message["type"] == "message":
-                data = json.loads(message["data"])
-                await websocket.send_json(data)
+                # Published payloads are already JSON - validate and forward
+                # them as-is instead of decoding and re-encoding
+                raw = message["data"]
+                orjson.loads(raw)
+                await websocket.send_text(raw.decode() if isinstance(raw, bytes) else raw)
                 
     except WebSocketDisconnect:
         logger.info("WebSocket disconnected normally")
@@ -143,9 +147,10 @@ async def event_stream() -> AsyncGenerator[str, None]:
         async for message in pubsub.listen():
             if message["type"] == "message":
                 try:
-                    data = json.loads(message["data"])
-                    yield f"data: {json.dumps(data)}\n\n"
-                except json.JSONDecodeError:
+                    raw = message["data"]
+                    orjson.loads(raw)
+                    yield f"data: {raw.decode() if isinstance(raw, bytes) else raw}\n\n"
+                except orjson.JSONDecodeError:
                     logger.warning("Invalid JSON in Redis message")
                     continue
                     
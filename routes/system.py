@@ -26,6 +26,24 @@ from core.settings import settings
 def get_redis_client():
     return redis.from_url(settings.redis_url)
 
+# Seconds each Celery control broadcast waits for worker replies
+CELERY_INSPECT_TIMEOUT = 2.0
+CELERY_QUEUES = ('celery', 'high_priority', 'low_priority')
+
+def get_queue_lengths() -> Dict[str, Any]:
+    """Read Celery queue lengths from the Redis broker in one round trip"""
+    try:
+        pipe = get_redis_client().pipeline(transaction=False)
+        for queue_name in CELERY_QUEUES:
+            pipe.llen(queue_name)
+        lengths = pipe.execute(raise_on_error=False)
+        return {
+            queue_name: length if isinstance(length, int) else "Unknown"
+            for queue_name, length in zip(CELERY_QUEUES, lengths)
+        }
+    except Exception:
+        return {"note": "Queue length info unavailable"}
+
 def get_cache_info():
     try:
         client = get_redis_client()
@@ -234,26 +252,18 @@ async def get_celery_health(
     Admin only endpoint for background task monitoring
     """
     try:
-        # Get active workers
-        active_workers = celery_app.control.inspect().active()
-        stats = celery_app.control.inspect().stats()
-        scheduled = celery_app.control.inspect().scheduled()
-        
-        # Get queue lengths
-        try:
-            from kombu import Connection
-            with Connection(celery_app.conf.broker_url) as conn:
-                # This is Redis-specific queue length checking
-                queue_lengths = {}
-                redis_client = get_redis_client()
-                for queue_name in ['celery', 'high_priority', 'low_priority']:
-                    try:
-                        length = redis_client.llen(queue_name)
-                        queue_lengths[queue_name] = length
-                    except:
-                        queue_lengths[queue_name] = "Unknown"
-        except Exception:
-            queue_lengths = {"note": "Queue length info unavailable"}
+        # Control broadcasts block until workers reply or the timeout passes,
+        # so they run concurrently off the event loop alongside the queue read
+        inspect = celery_app.control.inspect(timeout=CELERY_INSPECT_TIMEOUT)
+        active_workers, stats, scheduled, queue_lengths = await asyncio.wait_for(
+            asyncio.gather(
+                asyncio.to_thread(inspect.active),
+                asyncio.to_thread(inspect.stats),
+                asyncio.to_thread(inspect.scheduled),
+                asyncio.to_thread(get_queue_lengths)
+            ),
+            timeout=CELERY_INSPECT_TIMEOUT + 1
+        )
         
         # Calculate worker health
         worker_count = len(active_workers) if active_workers else 0
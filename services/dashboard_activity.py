@@ -30,19 +30,28 @@ class DashboardActivityTracker:
         self.activity_key = "dashboard:activity"
         self.last_refresh_key = "dashboard:last_refresh"
         self.active_sessions_key = "dashboard:active_sessions"
+        self.refresh_claim_key = "dashboard:refresh_claim"
         
         # Configuration
         self.session_timeout = 300  # 5 minutes (heartbeat timeout)
         self.refresh_interval = 900  # 15 minutes (auto-refresh when active)
         self.stale_threshold = 1800  # 30 minutes (consider data stale)
+        # 10 minutes (max wait before another on-load refresh may start)
+        self.refresh_claim_ttl = 600
     
-    def track_dashboard_access(self, user_id: Optional[str] = None, session_id: Optional[str] = None) -> None:
+    def track_dashboard_access(
+        self, user_id: Optional[str] = None, session_id: Optional[str] = None
+    ) -> Optional[float]:
         """
         Track that someone accessed the dashboard.
         
         Args:
             user_id: User ID if authenticated (optional)
             session_id: Session identifier (required for tracking)
+            
+        Returns:
+            Unix timestamp of the last refresh, read in the same round-trip as
+            the tracking writes, or None if none recorded or tracking failed
         """
         try:
             current_time = time.time()
@@ -59,18 +68,21 @@ class DashboardActivityTracker:
                 "timestamp": datetime.utcnow().isoformat()
             }
             
+            # The tracking writes and the last refresh read go out in a single round-trip
+            pipe = self.redis_client.pipeline(transaction=False)
+            
             # Store session with expiry
-            self.redis_client.hset(
+            pipe.hset(
                 self.active_sessions_key,
                 session_id,
                 json.dumps(session_data)
             )
             
             # Set expiry on the hash key (will be refreshed on next access)
-            self.redis_client.expire(self.active_sessions_key, self.session_timeout * 2)
+            pipe.expire(self.active_sessions_key, self.session_timeout * 2)
             
             # Update general activity timestamp
-            self.redis_client.set(
+            pipe.set(
                 self.activity_key,
                 json.dumps({
                     "last_activity": current_time,
@@ -79,11 +91,15 @@ class DashboardActivityTracker:
                 }),
                 ex=self.session_timeout * 2
             )
+            pipe.get(self.last_refresh_key)
+            refresh_data = pipe.execute()[-1]
             
             logger.info(f"📊 Dashboard access tracked: session={session_id}, user={user_id or 'anonymous'}")
+            return self._parse_last_refresh(refresh_data)
             
         except Exception as e:
             logger.error(f"Failed to track dashboard access: {e}")
+            return None
     
     def cleanup_expired_sessions(self) -> int:
         """
@@ -233,16 +249,20 @@ class DashboardActivityTracker:
             logger.error(f"Failed to determine auto-refresh: {e}")
             return False
     
-    def should_refresh_on_load(self) -> bool:
+    def should_refresh_on_load(self, last_refresh: Optional[float] = None) -> bool:
         """
         Determine if data should be refreshed on page load.
         Used when dashboard becomes active after being inactive.
         
+        Args:
+            last_refresh: Last refresh timestamp if already read (fetched otherwise)
+            
         Returns:
             True if data is stale and should be refreshed
         """
         try:
-            last_refresh = self.get_last_refresh_time()
+            if last_refresh is None:
+                last_refresh = self.get_last_refresh_time()
             if not last_refresh:
                 logger.info("✅ Refresh on load: No previous refresh recorded")
                 return True
@@ -261,6 +281,36 @@ class DashboardActivityTracker:
             logger.error(f"Failed to check refresh on load: {e}")
             return True  # Err on the side of refreshing
     
+    def claim_refresh_on_load(self, last_refresh: Optional[float] = None) -> bool:
+        """
+        Determine if this page load should trigger the on-load refresh.
+        While data is stale every load would otherwise queue its own refresh,
+        so only the caller that wins an atomic claim triggers one; the claim
+        is released when the refresh is recorded or after refresh_claim_ttl.
+        
+        Args:
+            last_refresh: Last refresh timestamp if already read (fetched otherwise)
+            
+        Returns:
+            True if data is stale and this caller should trigger the refresh
+        """
+        if not self.should_refresh_on_load(last_refresh):
+            return False
+        
+        try:
+            claimed = self.redis_client.set(
+                self.refresh_claim_key, time.time(), nx=True, ex=self.refresh_claim_ttl
+            )
+            if not claimed:
+                logger.debug(
+                    "🚫 No refresh on load: Refresh already triggered by another request"
+                )
+            return bool(claimed)
+            
+        except Exception as e:
+            logger.error(f"Failed to claim refresh on load: {e}")
+            return True  # Err on the side of refreshing
+    
     def record_refresh(self) -> None:
         """Record that a data refresh has occurred."""
         try:
@@ -274,6 +324,7 @@ class DashboardActivityTracker:
                 }),
                 ex=86400  # Keep for 24 hours
             )
+            self.redis_client.delete(self.refresh_claim_key)
             
             logger.info(f"📝 Recorded data refresh at {datetime.utcnow().isoformat()}")
             
@@ -288,16 +339,19 @@ class DashboardActivityTracker:
             Unix timestamp of last refresh, or None if no refresh recorded
         """
         try:
-            refresh_data = self.redis_client.get(self.last_refresh_key)
-            if refresh_data:
-                refresh_info = json.loads(refresh_data)
-                return refresh_info.get("last_refresh")
-            return None
+            return self._parse_last_refresh(self.redis_client.get(self.last_refresh_key))
             
         except Exception as e:
             logger.error(f"Failed to get last refresh time: {e}")
             return None
     
+    @staticmethod
+    def _parse_last_refresh(refresh_data) -> Optional[float]:
+        """Extract the refresh timestamp from a stored last refresh record"""
+        if refresh_data:
+            return json.loads(refresh_data).get("last_refresh")
+        return None
+    
     def get_stats(self) -> Dict:
         """
         Get dashboard activity statistics.
@@ -71,6 +71,15 @@ from services.fastapi_data_processor import fetch_raw_odds_data, process_opportu
 
 logger = logging.getLogger(__name__)
 
+# Event-name keywords used to guess the sport of legacy rows that predate the
+# 'sport' tag set at ingest
+SPORT_KEYWORDS = {
+    'americanfootball_nfl': ('nfl', 'football', 'patriots', 'cowboys', 'packers', 'steelers'),
+    'basketball_nba': ('nba', 'basketball', 'lakers', 'warriors', 'celtics', 'nets'),
+    'baseball_mlb': ('mlb', 'baseball', 'yankees', 'dodgers', 'red sox', 'giants'),
+    'icehockey_nhl': ('nhl', 'hockey', 'rangers', 'bruins', 'kings', 'devils')
+}
+
 
 class DataFetchResult:
     """
@@ -184,8 +193,11 @@ def fetch_opportunities_data() -> DataFetchResult:
         cached_analytics = get_analytics_data()
         last_update = get_last_update()
         
-        # Validate cache data integrity
-        if cached_opportunities and cached_analytics:
+        # Cached opportunities are enough to serve - missing analytics alone
+        # must not trigger a full odds API fetch and EV recomputation
+        if cached_opportunities:
+            if not cached_analytics:
+                logger.warning("⚠️  Analytics missing from cache - serving cached opportunities without them")
             logger.debug(f"✅ Cache hit: {len(cached_opportunities)} opportunities available")
             return DataFetchResult(
                 opportunities=cached_opportunities,
@@ -255,6 +267,7 @@ def apply_filters(opportunities: List[Dict[str, Any]],
     
     filtered_opps = []
     search_term = search.lower() if search else None
+    sport_keywords = SPORT_KEYWORDS.get(sport, (sport,)) if sport else ()
     
     for opp in opportunities:
         # Search filter
@@ -269,22 +282,17 @@ def apply_filters(opportunities: List[Dict[str, Any]],
             if search_term not in searchable_text:
                 continue
         
-        # Sport filter  
+        # Sport filter - rows carry the sport key they were fetched under
         if sport:
-            # Map sport codes to identifiers that might appear in event names
-            sport_keywords = {
-                'americanfootball_nfl': ['nfl', 'football', 'patriots', 'cowboys', 'packers', 'steelers'],
-                'basketball_nba': ['nba', 'basketball', 'lakers', 'warriors', 'celtics', 'nets'],
-                'baseball_mlb': ['mlb', 'baseball', 'yankees', 'dodgers', 'red sox', 'giants'],
-                'icehockey_nhl': ['nhl', 'hockey', 'rangers', 'bruins', 'kings', 'devils']
-            }
-            
-            keywords = sport_keywords.get(sport, [sport])
-            event_text = opp.get('event', '').lower()
-            
-            # Check if any sport keyword appears in the event
-            if not any(keyword in event_text for keyword in keywords):
-                continue
+            opp_sport = opp.get('sport')
+            if opp_sport:
+                if opp_sport != sport:
+                    continue
+            else:
+                # Legacy row without a sport tag - fall back to event-name keywords
+                event_text = opp.get('event', '').lower()
+                if not any(keyword in event_text for keyword in sport_keywords):
+                    continue
         
         filtered_opps.append(opp)
     
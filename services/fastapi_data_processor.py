@@ -4,6 +4,7 @@ Handles raw data fetching, processing, and opportunity generation without Stream
 """
 import time
 import os
+import sys
 import pickle
 from datetime import datetime, timedelta
 import logging
@@ -15,7 +16,7 @@ from services.odds_api import OddsAPIClient
 from core.fair_odds_calculator import FairOddsCalculator
 from core.ev_analyzer import EVAnalyzer
 from core.maker_odds_calculator import MakerOddsCalculator
-from utils.bet_matching import BetMatcher
+from utils.bet_matching import BetMatcher, _get_bookmaker_display_name
 from core.settings import settings
 
 logger = logging.getLogger(__name__)
@@ -240,7 +241,7 @@ def process_opportunities(raw_data: Dict[str, Any], force_refresh: bool = False)
             'processing_time': None
         }
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         # Process each sport
         for sport_key, events in raw_data['data'].items():
@@ -265,6 +266,9 @@ def process_opportunities(raw_data: Dict[str, Any], force_refresh: bool = False)
                         calculator, ev_analyzer, maker_calculator
                     )
                     
+                    for opportunity in market_opportunities:
+                        opportunity['sport'] = sport_key
+                    
                     opportunities.extend(market_opportunities)
                     sport_opportunities += len(market_opportunities)
             
@@ -278,14 +282,26 @@ def process_opportunities(raw_data: Dict[str, Any], force_refresh: bool = False)
         
         # Update analytics with deduplicated counts
         analytics['total_opportunities'] = len(deduplicated_opportunities)
-        analytics['processing_time'] = round(time.time() - start_time, 2)
+        analytics['processing_time'] = round(time.perf_counter() - start_time, 2)
         
         if deduplicated_opportunities:
-            ev_values = [opp.get('EV_Raw', 0) for opp in deduplicated_opportunities]
-            analytics['high_ev_count'] = sum(1 for ev in ev_values if ev >= 0.045)
-            analytics['positive_ev_count'] = sum(1 for ev in ev_values if ev > 0)
-            analytics['max_ev'] = max(ev_values)
-            analytics['avg_ev'] = sum(ev_values) / len(ev_values)
+            # Single pass for every EV aggregate
+            high_ev_count = positive_ev_count = 0
+            total_ev = 0.0
+            max_ev = None
+            for opp in deduplicated_opportunities:
+                ev = opp.get('EV_Raw', 0)
+                total_ev += ev
+                if ev > 0:
+                    positive_ev_count += 1
+                    if ev >= 0.045:
+                        high_ev_count += 1
+                if max_ev is None or ev > max_ev:
+                    max_ev = ev
+            analytics['high_ev_count'] = high_ev_count
+            analytics['positive_ev_count'] = positive_ev_count
+            analytics['max_ev'] = max_ev
+            analytics['avg_ev'] = total_ev / len(deduplicated_opportunities)
         
         result = (deduplicated_opportunities, analytics)
         
@@ -346,7 +362,8 @@ def _extract_markets_by_type(event: Dict[str, Any]) -> Dict[str, Dict[str, Any]]
     for bookmaker in event.get('bookmakers', []):
         bookmaker_key = bookmaker['key']
         for market in bookmaker.get('markets', []):
-            market_key = market['key']
+            # Interned so downstream market set lookups compare by identity
+            market_key = sys.intern(market['key'])
             if market_key not in markets_by_type:
                 markets_by_type[market_key] = {}
             markets_by_type[market_key][bookmaker_key] = market['outcomes']
@@ -409,7 +426,6 @@ def _analyze_single_market(event_display: str, market_key: str, market_odds: Dic
             # Format best available odds with exchange fee info
             best_odds_str = "N/A"
             if best_market:
-                from utils.bet_matching import _get_bookmaker_display_name
                 bookmaker_display = _get_bookmaker_display_name(best_market['bookmaker'])
                 is_exchange = best_market.get('is_exchange', False)
                 
@@ -571,21 +587,6 @@ def _format_bet_description(market_key: str, outcome_name: str, market_odds: Dic
             return f"{outcome_name}"
 
 
-def _get_bookmaker_display_name(bookmaker_key: str) -> str:
-    """Get display name for bookmaker"""
-    display_names = {
-        'draftkings': 'DraftKings',
-        'fanduel': 'FanDuel',
-        'pinnacle': 'Pinnacle',
-        'bovada': 'Bovada',
-        'betmgm': 'BetMGM',
-        'pointsbetus': 'PointsBet',
-        'williamhill_us': 'WilliamHill',
-        'betrivers': 'BetRivers'
-    }
-    return display_names.get(bookmaker_key, bookmaker_key.title())
-
-
 def _get_proposed_posting_odds(outcome_posting: Dict) -> str:
     """Get proposed posting odds string"""
     if not outcome_posting:
@@ -638,13 +639,11 @@ def _get_recommended_action(outcome_ev: Dict, outcome_posting: Dict) -> str:
     if ev_percentage >= 0.045:  # 4.5%+ EV
         best_market = outcome_ev.get('best_market_odds')
         if best_market:
-            from utils.bet_matching import _get_bookmaker_display_name
             bookmaker = _get_bookmaker_display_name(best_market['bookmaker'])
             return f"Strong Take: {bookmaker} ({ev_percentage*100:+.1f}% EV)"
     elif ev_percentage >= 0.025:  # 2.5%+ EV
         best_market = outcome_ev.get('best_market_odds')
         if best_market:
-            from utils.bet_matching import _get_bookmaker_display_name
             bookmaker = _get_bookmaker_display_name(best_market['bookmaker'])
             return f"Take bet: {bookmaker} ({ev_percentage*100:+.1f}% EV)"
     elif ev_percentage > 0:  # Any positive EV
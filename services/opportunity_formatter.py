@@ -1,23 +1,59 @@
 """
 Opportunity formatter to transform backend data to frontend expected format
 """
+import functools
+import heapq
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Main line markets (for basic users) - full game only
+MAIN_LINE_MARKETS = frozenset({
+    'h2h', 'spreads', 'totals', 'spread', 'total', 'point_spread', 'over_under', 'money_line'
+})
+
+# Period-specific markets are considered premium features
+PERIOD_SPECIFIC_MARKETS = frozenset({
+    'h2h_1st_5_innings', 'h2h_h1', 'h2h_h2', 'h2h_q1', 'h2h_q2', 'h2h_q3', 'h2h_q4', 'h2h_p1', 'h2h_p2', 'h2h_p3',
+    'spreads_1st_5_innings', 'spreads_h1', 'spreads_h2', 'spreads_q1', 'spreads_q2', 'spreads_q3', 'spreads_q4',
+    'totals_1st_5_innings', 'totals_h1', 'totals_h2', 'totals_q1', 'totals_q2', 'totals_q3', 'totals_q4'
+})
+
+def build_search_blob(*fields):
+    """Lowercased text that /api/opportunities search terms are matched against"""
+    return " ".join(field for field in fields if field).lower()
+
+def search_blob(row):
+    """
+    Search text for a formatted opportunity
+    Precomputed views store it in a parallel index (see store_ui_view), so it
+    is only built per request for rows formatted on demand
+    """
+    return build_search_blob(row['event'], row['bet_description'], row['bet_type'])
+
+@functools.lru_cache(maxsize=4096)
+def _parse_available_odds(all_odds):
+    """
+    Parse an "All Available Odds" string into (bookmaker, odds) pairs
+    Memoized - paid tiers format the same cached rows on every request
+    """
+    pairs = []
+    for part in all_odds.split(';'):
+        if ':' in part:
+            bookmaker, odds = part.strip().split(':', 1)
+            pairs.append((bookmaker.strip(), odds.strip()))
+    return tuple(pairs)
+
 def format_opportunity(opp):
     """Format a single opportunity to match frontend expected structure"""
     # Parse available odds from string format
     available_odds = []
-    if isinstance(opp.get('All Available Odds'), str):
-        odds_parts = opp.get('All Available Odds', '').split(';')
-        for part in odds_parts:
-            if ':' in part:
-                bookmaker, odds = part.strip().split(':', 1)
-                available_odds.append({
-                    'bookmaker': bookmaker.strip(),
-                    'odds': odds.strip()
-                })
+    all_odds = opp.get('All Available Odds')
+    if isinstance(all_odds, str):
+        available_odds = [
+            {'bookmaker': bookmaker, 'odds': odds}
+            for bookmaker, odds in _parse_available_odds(all_odds)
+        ]
     
     # Extract EV percentage value
     ev_raw = opp.get('EV_Raw', 0)
@@ -74,56 +110,52 @@ def format_opportunity(opp):
         '_original': opp  # For debugging
     }
 
+def _raw_ev_percentage(opp):
+    """EV percentage of an unformatted opportunity (same rule as format_opportunity)"""
+    ev_raw = opp.get('EV_Raw', 0)
+    return ev_raw * 100 if isinstance(ev_raw, (int, float)) else 0
+
 def format_opportunities_for_frontend(opportunities, user_role="free", limit=None):
-    """Format opportunities list for frontend consumption"""
+    """
+    Format opportunities list for frontend consumption
+    Role restrictions are applied to the raw rows first so only rows the
+    caller can see are formatted
+    """
     if not opportunities:
         return []
     
-    # Transform each opportunity
-    formatted = [format_opportunity(opp) for opp in opportunities]
-    
-    # Define main line markets (for basic users) - full game only
-    main_line_markets = {
-        'h2h', 'spreads', 'totals', 'spread', 'total', 'point_spread', 'over_under', 'money_line'
-    }
-    
-    # Period-specific markets are considered premium features
-    period_specific_markets = {
-        'h2h_1st_5_innings', 'h2h_h1', 'h2h_h2', 'h2h_q1', 'h2h_q2', 'h2h_q3', 'h2h_q4', 'h2h_p1', 'h2h_p2', 'h2h_p3',
-        'spreads_1st_5_innings', 'spreads_h1', 'spreads_h2', 'spreads_q1', 'spreads_q2', 'spreads_q3', 'spreads_q4',
-        'totals_1st_5_innings', 'totals_h1', 'totals_h2', 'totals_q1', 'totals_q2', 'totals_q3', 'totals_q4'
-    }
-    
     # Apply role-based filtering
     if user_role in ["free", "anonymous", None]:
         # Free/unauthenticated users: Sort by EV and limit to 10 worst opportunities
         logger.info(f"Applying free user restrictions: limiting to 10 worst opportunities")
-        formatted.sort(key=lambda x: x['ev_percentage'])
-        formatted = formatted[:10] if len(formatted) > 10 else formatted
+        opportunities = heapq.nsmallest(10, opportunities, key=_raw_ev_percentage)
     elif user_role == "basic":
         # Basic users: Only full-game main lines (no period-specific or player props)
-        original_count = len(formatted)
+        original_count = len(opportunities)
         
         # Filter to main lines only, excluding period-specific markets
         main_line_opportunities = [
-            opp for opp in formatted 
-            if opp['bet_type'] in main_line_markets and opp['bet_type'] not in period_specific_markets
+            opp for opp in opportunities 
+            if opp.get('Market', '') in MAIN_LINE_MARKETS and opp.get('Market', '') not in PERIOD_SPECIFIC_MARKETS
         ]
         
         if main_line_opportunities:
             # Show only full-game main lines
-            formatted = main_line_opportunities
-            logger.info(f"Basic user filter: {original_count} -> {len(formatted)} opportunities (full-game main lines only)")
+            opportunities = main_line_opportunities
+            logger.info(f"Basic user filter: {original_count} -> {len(opportunities)} opportunities (full-game main lines only)")
         else:
             # Show player props as fallback if no main lines available  
-            logger.info(f"Basic user filter: No full-game main lines available, showing {len(formatted)} opportunities as fallback")
+            logger.info(f"Basic user filter: No full-game main lines available, showing {len(opportunities)} opportunities as fallback")
             logger.info("Note: Basic plan normally includes only full-game main lines (moneyline, spreads, totals)")
             logger.info("Period-specific markets (1st 5 innings, quarters, etc.) require Premium subscription")
     # Premium, admin users see everything (no filtering)
     
     # Apply limit if specified
-    if limit and len(formatted) > limit:
-        formatted = formatted[:limit]
+    if limit and len(opportunities) > limit:
+        opportunities = opportunities[:limit]
+    
+    # Transform only the rows that survived filtering
+    formatted = [format_opportunity(opp) for opp in opportunities]
     
     logger.info(f"Formatted {len(formatted)} opportunities for role {user_role}")
-    return formatted
\ No newline at end of file
+    return formatted
@@ -95,15 +95,20 @@ class PersistenceMonitor:
             if not metrics:
                 continue
                 
-            durations = [m["duration_ms"] for m in metrics]
-            successes = [m["success"] for m in metrics]
+            # One pass for the success count, one sort for min/max/p95
+            success_count = 0
+            durations = []
+            for m in metrics:
+                success_count += bool(m["success"])
+                durations.append(m["duration_ms"])
+            durations.sort()
             
             summary["operations_by_type"][op_type] = {
                 "count": len(metrics),
-                "success_rate": sum(successes) / len(successes) * 100,
+                "success_rate": success_count / len(metrics) * 100,
                 "avg_duration_ms": sum(durations) / len(durations),
-                "min_duration_ms": min(durations),
-                "max_duration_ms": max(durations),
+                "min_duration_ms": durations[0],
+                "max_duration_ms": durations[-1],
                 "p95_duration_ms": self._percentile(durations, 95)
             }
         
@@ -178,11 +183,10 @@ class PersistenceMonitor:
         
         return health
     
-    def _percentile(self, values: List[float], percentile: int) -> float:
-        """Calculate percentile of values"""
-        if not values:
+    def _percentile(self, sorted_values: List[float], percentile: int) -> float:
+        """Calculate percentile of values (callers pass them already sorted)"""
+        if not sorted_values:
             return 0.0
-        sorted_values = sorted(values)
         k = (len(sorted_values) - 1) * percentile / 100
         f = int(k)
         c = k - f
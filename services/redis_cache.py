@@ -3,11 +3,14 @@ Redis cache layer for bet-intel
 Handles caching of EV opportunities and analytics data
 """
 import redis
-import json
+import redis.asyncio as aioredis
+import orjson
 import logging
-from typing import List, Dict, Any, Optional
+import time
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 from core.settings import settings
+from services.opportunity_formatter import search_blob
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +19,16 @@ REDIS_URL = settings.redis_url
 EV_CACHE_KEY = "ev_opportunities"
 ANALYTICS_CACHE_KEY = "ev_analytics"
 LAST_UPDATE_KEY = "last_update"
+UI_VIEW_CACHE_KEY_PREFIX = "ev_opportunities:ui:"
+# Search text for each view row, in row order - kept out of the rows so views
+# are served exactly as stored
+UI_SEARCH_CACHE_KEY_PREFIX = "ev_opportunities:ui_search:"
+UI_VIEW_TIERS = ("free", "full")
+SPORT_CACHE_KEY_PREFIX = "ev_opportunities:sport:"
+EXPORT_CACHE_KEY_PREFIX = "ev_opportunities:export:"
+# Export entries are keyed by refresh timestamp, so the TTL only bounds how
+# long superseded entries linger
+EXPORT_CACHE_TTL = settings.refresh_interval_minutes * 60 + 30
 
 # Initialize Redis client
 try:
@@ -27,6 +40,71 @@ except Exception as e:
     logger.error(f"❌ Failed to connect to Redis: {e}")
     redis_client = None
 
+# Async client for request handlers - created lazily so it binds to the running loop
+_async_redis_client: Optional[aioredis.Redis] = None
+
+# Parsed payloads read by request handlers are kept per worker - repeat reads
+# skip the payload transfer and the JSON parse. Each entry is tagged with the
+# last_update read before it and is a miss once a refresh moves it on. Refreshes
+# write last_update after every payload (store_last_update), so an entry is
+# never older than its tag; the TTL is a backstop for payloads rewritten
+# without a new timestamp
+_l1_cache: Dict[str, Tuple[str, float, Any]] = {}
+L1_CACHE_TTL = 5
+
+def get_async_redis_client() -> aioredis.Redis:
+    """
+    Get the shared async Redis client used by request handlers
+    Reads through this client do not block the event loop
+    """
+    global _async_redis_client
+    if _async_redis_client is None:
+        _async_redis_client = aioredis.from_url(REDIS_URL, decode_responses=True)
+    return _async_redis_client
+
+async def close_async_redis_client() -> None:
+    """Close the shared async Redis client (called on application shutdown)"""
+    global _async_redis_client
+    if _async_redis_client is not None:
+        await _async_redis_client.aclose()
+        _async_redis_client = None
+
+# Cached payloads are encoded with orjson - non-string keys are stringified
+# as json.dumps did, and float NaN/inf are written as null
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+def _dumps(value: Any) -> bytes:
+    return orjson.dumps(value, option=_ORJSON_OPTIONS)
+
+async def _get_parsed_async(key: str, last_update: Optional[str] = None) -> Any:
+    """
+    Read and parse a cached payload, serving repeat reads from the worker L1
+    Callers share the returned object and must not mutate it
+    Args:
+        key: Redis key of the payload
+        last_update: Refresh timestamp the caller is serving, read before the
+            payload (read here if not given)
+    Returns:
+        Parsed value, None if the key is not in Redis
+    """
+    client = get_async_redis_client()
+    if last_update is None:
+        last_update = await client.get(LAST_UPDATE_KEY)
+    
+    now = time.monotonic()
+    entry = _l1_cache.get(key)
+    if entry is not None and last_update is not None and entry[0] == last_update and entry[1] > now:
+        return entry[2]
+    
+    data = await client.get(key)
+    if data is None:
+        return None
+    value = orjson.loads(data)
+    # Only keys that exist are kept, so the L1 is bounded by the cache's own keys
+    if last_update is not None:
+        _l1_cache[key] = (last_update, now + L1_CACHE_TTL, value)
+    return value
+
 def store_ev_data(ev_list: List[Dict[str, Any]]) -> bool:
     """
     Store EV opportunities data in Redis
@@ -47,8 +125,9 @@ def store_ev_data(ev_list: List[Dict[str, Any]]) -> bool:
             'timestamp': datetime.utcnow().isoformat()
         }
         
-        redis_client.set(EV_CACHE_KEY, json.dumps(data_to_store))
-        redis_client.set(LAST_UPDATE_KEY, datetime.utcnow().isoformat())
+        # The refresh timestamp is written separately by store_last_update once
+        # every payload derived from this data is in place
+        redis_client.set(EV_CACHE_KEY, _dumps(data_to_store))
         
         logger.info(f"✅ Stored {len(ev_list)} EV opportunities in Redis")
         return True
@@ -57,6 +136,25 @@ def store_ev_data(ev_list: List[Dict[str, Any]]) -> bool:
         logger.error(f"❌ Failed to store EV data in Redis: {e}")
         return False
 
+def store_last_update() -> bool:
+    """
+    Publish the refresh timestamp for the data just stored
+    Must be the last write of a refresh - readers tag responses and L1 entries
+    with this timestamp, so every payload it covers has to be written first
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    if not redis_client:
+        logger.error("Redis client not available")
+        return False
+    
+    try:
+        redis_client.set(LAST_UPDATE_KEY, datetime.utcnow().isoformat())
+        return True
+    except Exception as e:
+        logger.error(f"❌ Failed to store refresh timestamp in Redis: {e}")
+        return False
+
 def get_ev_data() -> List[Dict[str, Any]]:
     """
     Retrieve EV opportunities data from Redis
@@ -70,7 +168,7 @@ def get_ev_data() -> List[Dict[str, Any]]:
     try:
         data = redis_client.get(EV_CACHE_KEY)
         if data:
-            parsed_data = json.loads(data)
+            parsed_data = orjson.loads(data)
             opportunities = parsed_data.get('opportunities', [])
             logger.info(f"✅ Retrieved {len(opportunities)} EV opportunities from Redis")
             return opportunities
@@ -82,6 +180,174 @@ def get_ev_data() -> List[Dict[str, Any]]:
         logger.error(f"❌ Failed to retrieve EV data from Redis: {e}")
         return []
 
+async def get_ev_data_async(last_update: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Async variant of get_ev_data for use inside request handlers
+    Args:
+        last_update: Refresh timestamp the caller is serving (read here if not given)
+    Returns:
+        List of EV opportunity dictionaries, empty list if no data or error
+    """
+    try:
+        data = await _get_parsed_async(EV_CACHE_KEY, last_update)
+        if data:
+            opportunities = data.get('opportunities', [])
+            logger.info(f"✅ Retrieved {len(opportunities)} EV opportunities from Redis")
+            return opportunities
+        else:
+            logger.info("No EV data found in Redis cache")
+            return []
+            
+    except Exception as e:
+        logger.error(f"❌ Failed to retrieve EV data from Redis: {e}")
+        return []
+
+def store_ui_view(tier: str, formatted_opportunities: List[Dict[str, Any]]) -> bool:
+    """
+    Store a frontend-formatted view of the opportunities in Redis
+    A tier's view is identical for every user of that tier between refreshes,
+    so it is materialized once at refresh time instead of formatted per request
+    Args:
+        tier: View tier - "free" (guest sample) or "full" (unfiltered paid view)
+        formatted_opportunities: Output of format_opportunities_for_frontend for the tier
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    if not redis_client:
+        logger.error("Redis client not available")
+        return False
+    
+    try:
+        # Written in one transaction so a view is never read with another write's index
+        pipe = redis_client.pipeline()
+        pipe.set(f"{UI_VIEW_CACHE_KEY_PREFIX}{tier}", _dumps(formatted_opportunities))
+        pipe.set(
+            f"{UI_SEARCH_CACHE_KEY_PREFIX}{tier}",
+            _dumps([search_blob(row) for row in formatted_opportunities])
+        )
+        pipe.execute()
+        logger.info(f"✅ Stored {tier} view ({len(formatted_opportunities)} opportunities) in Redis")
+        return True
+        
+    except Exception as e:
+        logger.error(f"❌ Failed to store {tier} view in Redis: {e}")
+        return False
+
+async def get_ui_view_async(tier: str, last_update: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Retrieve a precomputed frontend view
+    Args:
+        tier: View tier - "free" or "full"
+        last_update: Refresh timestamp the caller is serving (read here if not given)
+    Returns:
+        List of formatted opportunities, empty list if not materialized yet or error
+    """
+    try:
+        return await _get_parsed_async(f"{UI_VIEW_CACHE_KEY_PREFIX}{tier}", last_update) or []
+    except Exception as e:
+        logger.error(f"❌ Failed to retrieve {tier} view from Redis: {e}")
+        return []
+
+async def get_ui_search_async(tier: str, last_update: Optional[str] = None) -> Optional[List[str]]:
+    """
+    Retrieve the search text index of a precomputed frontend view
+    Args:
+        tier: View tier - "free" or "full"
+        last_update: Refresh timestamp the caller is serving (read here if not given)
+    Returns:
+        Search text per view row, None if not materialized or error
+    """
+    try:
+        return await _get_parsed_async(f"{UI_SEARCH_CACHE_KEY_PREFIX}{tier}", last_update)
+    except Exception as e:
+        logger.error(f"❌ Failed to retrieve {tier} search index from Redis: {e}")
+        return None
+
+def store_sport_data(ev_list: List[Dict[str, Any]], sports: List[str]) -> bool:
+    """
+    Store per-sport slices of the EV opportunities in Redis
+    Sport-filtered requests then deserialize only the rows they return
+    Args:
+        ev_list: List of EV opportunity dictionaries tagged with 'sport'
+        sports: Supported sport keys - sports without opportunities get an empty slice
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    if not redis_client:
+        logger.error("Redis client not available")
+        return False
+    
+    try:
+        by_sport: Dict[str, List[Dict[str, Any]]] = {sport: [] for sport in sports}
+        for opp in ev_list:
+            by_sport.setdefault(opp.get('sport', ''), []).append(opp)
+        
+        pipe = redis_client.pipeline(transaction=False)
+        for sport, sport_opportunities in by_sport.items():
+            if sport:
+                pipe.set(f"{SPORT_CACHE_KEY_PREFIX}{sport}", _dumps(sport_opportunities))
+        pipe.execute()
+        
+        logger.info(f"✅ Stored per-sport EV slices for {len(by_sport)} sports in Redis")
+        return True
+        
+    except Exception as e:
+        logger.error(f"❌ Failed to store per-sport EV data in Redis: {e}")
+        return False
+
+async def get_sport_data_async(
+    sport: str, last_update: Optional[str] = None
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Retrieve the EV opportunities for a single sport
+    Args:
+        sport: Sport key
+        last_update: Refresh timestamp the caller is serving (read here if not given)
+    Returns:
+        List of EV opportunity dictionaries, None if the slice is not cached
+    """
+    try:
+        return await _get_parsed_async(f"{SPORT_CACHE_KEY_PREFIX}{sport}", last_update)
+    except Exception as e:
+        logger.error(f"❌ Failed to retrieve {sport} EV data from Redis: {e}")
+        return None
+
+async def get_export_async(variant: str, last_update: str) -> Optional[Tuple[int, str]]:
+    """
+    Retrieve a pre-encoded raw export for the given data refresh
+    Returns:
+        (row count, JSON-encoded rows) or None if not cached
+    """
+    try:
+        key = f"{EXPORT_CACHE_KEY_PREFIX}{variant}:{last_update}"
+        cached = await get_async_redis_client().hgetall(key)
+        return (int(cached['count']), cached['rows']) if cached else None
+    except Exception as e:
+        logger.error(f"❌ Failed to retrieve {variant} export from Redis: {e}")
+        return None
+
+async def store_export_async(variant: str, last_update: str, count: int, rows_json: bytes) -> bool:
+    """
+    Cache a JSON-encoded raw export for the given data refresh
+    Args:
+        variant: Export shape - "full" (with metadata) or "core"
+        last_update: Refresh timestamp the export was built from
+        count: Number of exported rows
+        rows_json: JSON-encoded list of exported rows
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    try:
+        key = f"{EXPORT_CACHE_KEY_PREFIX}{variant}:{last_update}"
+        pipe = get_async_redis_client().pipeline(transaction=False)
+        pipe.hset(key, mapping={'count': count, 'rows': rows_json})
+        pipe.expire(key, EXPORT_CACHE_TTL)
+        await pipe.execute()
+        return True
+    except Exception as e:
+        logger.error(f"❌ Failed to store {variant} export in Redis: {e}")
+        return False
+
 def store_analytics_data(analytics: Dict[str, Any]) -> bool:
     """
     Store analytics data in Redis
@@ -100,7 +366,7 @@ def store_analytics_data(analytics: Dict[str, Any]) -> bool:
             'timestamp': datetime.utcnow().isoformat()
         }
         
-        redis_client.set(ANALYTICS_CACHE_KEY, json.dumps(analytics_with_timestamp))
+        redis_client.set(ANALYTICS_CACHE_KEY, _dumps(analytics_with_timestamp))
         logger.info("✅ Stored analytics data in Redis")
         return True
         
@@ -121,7 +387,7 @@ def get_analytics_data() -> Dict[str, Any]:
     try:
         data = redis_client.get(ANALYTICS_CACHE_KEY)
         if data:
-            analytics = json.loads(data)
+            analytics = orjson.loads(data)
             logger.info("✅ Retrieved analytics data from Redis")
             return analytics
         else:
@@ -147,6 +413,18 @@ def get_last_update() -> Optional[str]:
         logger.error(f"❌ Failed to retrieve last update time: {e}")
         return None
 
+async def get_last_update_async() -> Optional[str]:
+    """
+    Async variant of get_last_update for use inside request handlers
+    Returns:
+        ISO timestamp string or None if no update recorded
+    """
+    try:
+        return await get_async_redis_client().get(LAST_UPDATE_KEY)
+    except Exception as e:
+        logger.error(f"❌ Failed to retrieve last update time: {e}")
+        return None
+
 def clear_cache() -> bool:
     """
     Clear all cached data
@@ -159,7 +437,10 @@ def clear_cache() -> bool:
     
     try:
         keys_to_delete = [EV_CACHE_KEY, ANALYTICS_CACHE_KEY, LAST_UPDATE_KEY]
+        keys_to_delete += [f"{UI_VIEW_CACHE_KEY_PREFIX}{tier}" for tier in UI_VIEW_TIERS]
+        keys_to_delete += [f"{UI_SEARCH_CACHE_KEY_PREFIX}{tier}" for tier in UI_VIEW_TIERS]
         deleted_count = redis_client.delete(*keys_to_delete)
+        _l1_cache.clear()
         logger.info(f"✅ Cleared {deleted_count} cache keys from Redis")
         return True
         
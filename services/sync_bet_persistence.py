@@ -375,27 +375,12 @@ class SyncBetPersistenceService:
         best_odds = opportunity.get('Best Available Odds', '+100')
         
         try:
-            # Clean up the odds string - extract just the numeric part
-            import re
-            
             # Handle formats like "ProphetX 184 (180)", "+150", "-110", etc.
-            # Extract the first number that looks like odds
-            odds_match = re.search(r'[+-]?\d+', str(best_odds))
-            
-            if odds_match:
-                odds_str = odds_match.group()
-                # Ensure it has a sign
-                if not odds_str.startswith(('+', '-')):
-                    odds_str = '+' + odds_str
-            else:
-                # Fallback to even odds
-                odds_str = '+100'
-            
-            # Convert American odds to decimal
-            if odds_str.startswith('-'):
-                american_int = -int(odds_str[1:])
-            else:
-                american_int = int(odds_str.replace('+', ''))
+            # Fallback to even odds when no number is present
+            american_int = MathUtils.parse_american_odds(str(best_odds))
+            if american_int is None:
+                american_int = 100
+            odds_str = f"{american_int:+d}"
             
             decimal_odds = MathUtils.american_to_decimal(american_int)
             
@@ -422,26 +407,12 @@ class SyncBetPersistenceService:
         fair_odds = opportunity.get('Fair Odds', '+100')
         
         try:
-            # Clean up the odds string - extract just the numeric part
-            import re
-            
             # Handle formats like "ProphetX 184 (180)", "+150", "-110", etc.
-            odds_match = re.search(r'[+-]?\d+', str(fair_odds))
-            
-            if odds_match:
-                odds_str = odds_match.group()
-                # Ensure it has a sign
-                if not odds_str.startswith(('+', '-')):
-                    odds_str = '+' + odds_str
-            else:
-                # Fallback to even odds
-                odds_str = '+100'
-            
-            # Convert American odds to decimal
-            if odds_str.startswith('-'):
-                american_int = -int(odds_str[1:])
-            else:
-                american_int = int(odds_str.replace('+', ''))
+            # Fallback to even odds when no number is present
+            american_int = MathUtils.parse_american_odds(str(fair_odds))
+            if american_int is None:
+                american_int = 100
+            odds_str = f"{american_int:+d}"
             
             decimal_odds = MathUtils.american_to_decimal(american_int)
             
@@ -854,15 +825,11 @@ class SyncBetPersistenceService:
                     
                     if book_id:
                         # Extract American odds (handle both "+120" and "+142 (+139)" formats)
-                        import re
-                        odds_match = re.search(r'([+-]?\d+)', odds_str)
-                        if odds_match:
-                            american_odds = odds_match.group(1)
-                            if not american_odds.startswith(('+', '-')):
-                                american_odds = '+' + american_odds
+                        american_int = MathUtils.parse_american_odds(odds_str)
+                        if american_int is not None:
+                            american_odds = f"{american_int:+d}"
                             
                             # Convert to decimal
-                            american_int = int(american_odds.replace('+', '')) if american_odds.startswith('+') else int(american_odds)
                             decimal_odds = MathUtils.american_to_decimal(american_int)
                             
                             books_data[book_id] = {
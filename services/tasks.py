@@ -5,8 +5,8 @@ Background tasks for data processing and real-time updates
 
 import os
 import time
-import json
 import logging
+import redis
 from datetime import datetime
 from typing import Dict, List, Any
 from celery import shared_task
@@ -14,8 +14,13 @@ from celery.signals import worker_shutdown
 
 from services.celery_app import celery_app
 from services.fastapi_data_processor import fetch_raw_odds_data, process_opportunities
-from services.redis_cache import store_ev_data, store_analytics_data, health_check as redis_health_check
+from services.redis_cache import (
+    redis_client, store_ev_data, store_analytics_data, store_ui_view, store_sport_data,
+    store_last_update, health_check as redis_health_check, _dumps
+)
+from services.opportunity_formatter import format_opportunities_for_frontend
 from services.dashboard_activity import dashboard_activity
+from core.config import feature_config
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -29,6 +34,10 @@ SPORTS_SUPPORTED = [
     'icehockey_nhl'
 ]
 
+# Free tier cache shaping - resolved once at import instead of per refresh
+FREE_MAIN_LINES = frozenset({"h2h", "spreads", "totals"})
+MASK_FIELDS_FOR_FREE = feature_config.MASK_FIELDS_FOR_FREE
+
 # Redis configuration
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 
@@ -244,10 +253,13 @@ def refresh_odds_data(self, force_refresh=False, skip_activity_check=False):
         
         # Store processed data in Redis with role-based caching
         store_ev_data(all_opportunities)
+        store_sport_data(all_opportunities, SPORTS_SUPPORTED)
         store_analytics_data(analytics)
         
         # Store role-specific cached data for performance
         store_role_based_cache(all_opportunities, analytics)
+        # Published last so readers never see the new timestamp with old views
+        store_last_update()
         
         # NEW: Persist opportunities to database using sync service
         try:
@@ -295,7 +307,7 @@ def refresh_odds_data(self, force_refresh=False, skip_activity_check=False):
             }
         
         # Publish real-time update
-        publish_realtime_update(all_opportunities)
+        publish_realtime_update(all_opportunities, analytics)
         
         # Record successful refresh for activity tracking
         dashboard_activity.record_refresh()
@@ -403,72 +415,89 @@ def generate_analytics(opportunities: List[Dict[str, Any]]) -> Dict[str, Any]:
     if not opportunities:
         return {'total_opportunities': 0, 'avg_ev': 0, 'high_ev_count': 0}
     
-    ev_values = [opp.get('EV_Raw', 0) for opp in opportunities if opp.get('EV_Raw')]
+    # Single pass over the opportunities for every aggregate
+    ev_count = positive_ev_count = high_ev_count = 0
+    total_ev = 0.0
+    max_ev = None
+    for opp in opportunities:
+        ev = opp.get('EV_Raw')
+        if not ev:
+            continue
+        ev_count += 1
+        total_ev += ev
+        if ev > 0:
+            positive_ev_count += 1
+            if ev >= 0.045:
+                high_ev_count += 1
+        if max_ev is None or ev > max_ev:
+            max_ev = ev
     
     return {
         'total_opportunities': len(opportunities),
-        'positive_ev_count': len([ev for ev in ev_values if ev > 0]),
-        'high_ev_count': len([ev for ev in ev_values if ev >= 0.045]),
-        'avg_ev': sum(ev_values) / len(ev_values) if ev_values else 0,
-        'max_ev': max(ev_values) if ev_values else 0,
+        'positive_ev_count': positive_ev_count,
+        'high_ev_count': high_ev_count,
+        'avg_ev': total_ev / ev_count if ev_count else 0,
+        'max_ev': max_ev if ev_count else 0,
         'last_updated': datetime.utcnow().isoformat()
     }
 
 def store_role_based_cache(opportunities: List[Dict[str, Any]], analytics: Dict[str, Any]):
     """Store pre-filtered data for different user roles to improve performance"""
     try:
-        from core.config.features import FeatureConfig
-        feature_config = FeatureConfig()
-        MASK_FIELDS_FOR_FREE = feature_config.MASK_FIELDS_FOR_FREE
-        
         # Free tier cache (market-filtered and masked, no quantity limit)
         free_opportunities = []
-        main_lines = {"h2h", "spreads", "totals"}
         
         for opp in opportunities:
             # Filter by main lines only for free users
-            if opp.get('Market', '') in main_lines:
-                filtered_opp = opp.copy()
-                # Mask advanced fields for free users
-                for field in MASK_FIELDS_FOR_FREE:
-                    filtered_opp.pop(field, None)
-                free_opportunities.append(filtered_opp)
+            if opp.get('Market', '') in FREE_MAIN_LINES:
+                # Mask advanced fields for free users - rows carrying none of
+                # them are shared as-is instead of copied
+                if MASK_FIELDS_FOR_FREE.isdisjoint(opp):
+                    free_opportunities.append(opp)
+                else:
+                    free_opportunities.append(
+                        {k: v for k, v in opp.items() if k not in MASK_FIELDS_FOR_FREE}
+                    )
         
         # Store in Redis with role-specific keys
-        import redis
-        import os
-        
-        redis_client = redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
-        
         # Cache for free users (main lines only, masked fields)
         redis_client.setex(
             "ev_opportunities:free", 
             3600,  # 1 hour expiry
-            json.dumps(free_opportunities)
+            _dumps(free_opportunities)
         )
         
         # Cache for full access users (subscribers/admins) - all markets
         redis_client.setex(
             "ev_opportunities:full",
             3600,
-            json.dumps(opportunities)
+            _dumps(opportunities)
         )
         
-        logger.info(f"📦 Role-based caches updated: {len(free_opportunities)} free (main lines), {len(opportunities)} full (all markets)")
+        # Frontend-ready views served directly by the opportunities routes
+        free_view = format_opportunities_for_frontend(opportunities, user_role="free")
+        store_ui_view("free", free_view)
+        full_view = format_opportunities_for_frontend(opportunities, user_role="subscriber")
+        store_ui_view("full", full_view)
+        
+        logger.info(
+            f"📦 Role-based caches updated: {len(free_opportunities)} free (main lines), "
+            f"{len(opportunities)} full (all markets), "
+            f"{len(free_view)}/{len(full_view)} free/full views"
+        )
         
     except Exception as e:
         logger.error(f"❌ Failed to store role-based cache: {str(e)}")
         # Don't fail the main task for cache issues
 
-def publish_realtime_update(opportunities: List[Dict[str, Any]]):
+def publish_realtime_update(opportunities: List[Dict[str, Any]], analytics: Dict[str, Any] = None):
     """
     Publish real-time update to Redis channel for WebSocket/SSE clients
+    Summary counts are taken from analytics when provided instead of re-scanning
     """
     try:
-        import redis
-        import os
-        
-        redis_client = redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+        if analytics is None:
+            analytics = generate_analytics(opportunities)
         
         # Create update payload for real-time clients
         update_payload = {
@@ -477,13 +506,13 @@ def publish_realtime_update(opportunities: List[Dict[str, Any]]):
             'data': opportunities[:50],  # Limit payload size for performance
             'summary': {
                 'total_count': len(opportunities),
-                'positive_ev_count': len([o for o in opportunities if o.get('EV_Raw', 0) > 0]),
-                'high_ev_count': len([o for o in opportunities if o.get('EV_Raw', 0) >= 0.045])
+                'positive_ev_count': analytics.get('positive_ev_count', 0),
+                'high_ev_count': analytics.get('high_ev_count', 0)
             }
         }
         
         # Publish to the real-time updates channel
-        redis_client.publish("ev_updates", json.dumps(update_payload))
+        redis_client.publish("ev_updates", _dumps(update_payload))
         logger.info(f"📡 Published real-time update with {len(opportunities)} opportunities at {update_payload['updated_at']}")
         
     except Exception as e:
@@ -553,10 +582,7 @@ def cleanup_old_data(self):
     try:
         logger.info("🧹 Running cleanup task")
         
-        import redis
-        import os
-        
-        redis_client = redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+        redis_client = redis.from_url(REDIS_URL)
         
         # Clean up old Celery results (older than 24 hours)
         pattern = "celery-task-meta-*"
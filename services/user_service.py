@@ -77,9 +77,18 @@ import logging
 
 from core.session import get_current_user_from_cookie
 from core.auth import UserCtx
+from core.config import feature_config
 
 logger = logging.getLogger(__name__)
 
+# UserCtx is immutable, so every guest request shares one context
+GUEST_USER = UserCtx(
+    id="guest",
+    email="guest@example.com",
+    role="free",
+    subscription_status="none"
+)
+
 
 def get_user_or_guest(request: Request) -> UserCtx:
     """
@@ -135,17 +144,10 @@ def get_user_or_guest(request: Request) -> UserCtx:
         # Log authentication failure for security monitoring
         logger.debug(f"⚠️  Authentication failed, falling back to guest: {e}")
     
-    # Create guest user context for free tier access
+    # Guest user context for free tier access
     # Guest users get limited access but can still use core features
-    guest_user = UserCtx(
-        id="guest",
-        email="guest@example.com",
-        role="free",
-        subscription_status="none"
-    )
-    
-    logger.debug("🔓 Created guest user context with free tier access")
-    return guest_user
+    logger.debug("🔓 Using guest user context with free tier access")
+    return GUEST_USER
 
 
 def is_guest_user(user: UserCtx) -> bool:
@@ -173,8 +175,6 @@ def get_role_features(user_role: str) -> Dict[str, Any]:
     Get feature access configuration for a user role
     Centralizes role-based feature access logic
     """
-    from core.config.features import FeatureConfig
-    feature_config = FeatureConfig()
     return feature_config.get_user_features(user_role)
 
 
@@ -18,7 +18,12 @@ from celery import shared_task
 
 # Import heavy computation services
 from services.fastapi_data_processor import fetch_raw_odds_data, process_opportunities
-from services.redis_cache import redis_client, store_ev_data, store_analytics_data
+from services.redis_cache import (
+    redis_client, store_ev_data, store_analytics_data, store_ui_view, store_sport_data,
+    store_last_update
+)
+from services.opportunity_formatter import format_opportunities_for_frontend
+from services.tasks import SPORTS_SUPPORTED
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +31,10 @@ logger = logging.getLogger(__name__)
 EV_BATCH_TTL = 300  # 5 minutes for batch results
 PROCESSING_STATUS_TTL = 600  # 10 minutes for status tracking
 
+# Batch results hold frontend-formatted opportunities from v2 on; the version
+# keeps readers from picking up raw-format results written before the change
+BATCH_RESULTS_KEY_PREFIX = "ev_batch_results:v2:"
+
 @shared_task(
     bind=True,
     name="tasks.ev.calculate_batch",
@@ -120,11 +129,14 @@ def calc_ev_batch(self, batch_id: str, _options: Optional[Dict[str, Any]] = None
             }
         )
         
-        # Step 3: Store results in Redis with TTL
-        batch_cache_key = f"ev_batch_results:{batch_id}"
+        # Step 3: Format once here so pollers serve the results verbatim
+        ui_opportunities = format_opportunities_for_frontend(opportunities, user_role="subscriber")
+        
+        # Store results in Redis with TTL
+        batch_cache_key = f"{BATCH_RESULTS_KEY_PREFIX}{batch_id}"
         results = {
             'batch_id': batch_id,
-            'opportunities': opportunities,
+            'opportunities': ui_opportunities,
             'analytics': analytics,
             'generated_at': datetime.utcnow().isoformat(),
             'processing_time_ms': round((time.perf_counter() - start_time) * 1000, 2),
@@ -138,9 +150,16 @@ def calc_ev_batch(self, batch_id: str, _options: Optional[Dict[str, Any]] = None
             json.dumps(results)
         )
         
-        # Also update the main cache for immediate access
+        # Also update the main cache and the views served from it for immediate access
         store_ev_data(opportunities)
         store_analytics_data(analytics)
+        # Every supported sport is written so sports that dropped to zero
+        # opportunities replace their old slice with an empty one
+        store_sport_data(opportunities, SPORTS_SUPPORTED)
+        store_ui_view("full", ui_opportunities)
+        store_ui_view("free", format_opportunities_for_frontend(opportunities, user_role="free"))
+        # Published last so readers never see the new timestamp with old views
+        store_last_update()
         
         # Update final status
         redis_client.setex(
@@ -248,7 +267,7 @@ def get_batch_results(batch_id: str) -> Optional[Dict[str, Any]]:
         Cached results or None if not found/expired
     """
     try:
-        batch_cache_key = f"ev_batch_results:{batch_id}"
+        batch_cache_key = f"{BATCH_RESULTS_KEY_PREFIX}{batch_id}"
         cached_data = redis_client.get(batch_cache_key)
         
         if cached_data:
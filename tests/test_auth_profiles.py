@@ -0,0 +1,238 @@
+"""
+Unit tests for the batched Supabase profile lookup in core.auth
+Supabase and Redis are replaced with in-memory fakes, so no services are needed
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+import core.auth as auth
+
+
+def _profile(user_id, role="premium"):
+    return {
+        "id": user_id,
+        "email": f"{user_id}@example.com",
+        "role": role,
+        "subscription_status": "active",
+    }
+
+
+class FakeSupabase:
+    """Answers profiles `in_` queries from a dict, recording each query's ids"""
+
+    def __init__(self, rows=None, error=None, delay=0.0):
+        self.rows = rows or {}
+        self.error = error
+        self.delay = delay
+        self.queries = []
+
+    def table(self, name):
+        assert name == "profiles"
+        return self
+
+    def select(self, _columns):
+        return self
+
+    def in_(self, column, values):
+        assert column == "id"
+        self._ids = list(values)
+        return self
+
+    def execute(self):
+        self.queries.append(self._ids)
+        if self.delay:
+            time.sleep(self.delay)
+        error = self.error.pop(0) if isinstance(self.error, list) else self.error
+        if error is not None:
+            raise error
+        return SimpleNamespace(data=[self.rows[i] for i in self._ids if i in self.rows])
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+
+    def set(self, key, value, ex=None):
+        self.redis.values[key] = value
+
+    def delete(self, key):
+        self.redis.values.pop(key, None)
+
+    def publish(self, channel, message):
+        self.redis.published.append((channel, message))
+
+    async def execute(self):
+        return []
+
+
+class FakeRedis:
+    def __init__(self, values=None):
+        self.values = values or {}
+        self.published = []
+
+    async def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+@pytest.fixture
+def supabase(monkeypatch):
+    fake = FakeSupabase()
+    monkeypatch.setattr(auth, "get_supabase", lambda: fake)
+    return fake
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(auth, "get_async_redis_client", lambda: fake)
+    return fake
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    auth._profile_cache.clear()
+    auth._profile_lookups.clear()
+    auth._profile_batch.clear()
+    breaker = auth._CircuitBreaker("test", threshold=2, cooldown=30.0)
+    monkeypatch.setattr(auth, "_profile_breaker", breaker)
+    monkeypatch.setattr(auth, "PROFILE_RETRY_BASE_DELAY", 0)
+    yield
+    auth._profile_cache.clear()
+    auth._profile_lookups.clear()
+    auth._profile_batch.clear()
+
+
+async def _drain_batches():
+    # Let lookups abandoned by a timed out caller finish before the loop closes
+    while auth._profile_batch_tasks:
+        await asyncio.gather(*auth._profile_batch_tasks, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_lookups_share_one_query(supabase, redis):
+    supabase.rows = {"u1": _profile("u1"), "u2": _profile("u2", role="basic")}
+
+    results = await asyncio.gather(
+        auth.fetch_user_profile("u1"),
+        auth.fetch_user_profile("u1"),
+        auth.fetch_user_profile("u2"),
+    )
+
+    assert results == [supabase.rows["u1"], supabase.rows["u1"], supabase.rows["u2"]]
+    assert supabase.queries == [["u1", "u2"]]
+    # Found rows are cached in-process and shared through Redis
+    assert await auth.fetch_user_profile("u1") == supabase.rows["u1"]
+    assert len(supabase.queries) == 1
+    assert set(redis.values) == {"auth:profile:u1", "auth:profile:u2"}
+
+
+@pytest.mark.asyncio
+async def test_batch_serves_shared_rows_and_missing_profiles(supabase, redis):
+    redis.values["auth:profile:u1"] = auth.orjson.dumps(_profile("u1"))
+    supabase.rows = {"u2": _profile("u2")}
+
+    results = await asyncio.gather(
+        auth.fetch_user_profile("u1"),
+        auth.fetch_user_profile("u2"),
+        auth.fetch_user_profile("u3"),
+    )
+
+    assert results == [_profile("u1"), _profile("u2"), None]
+    # Only the Redis misses reach Supabase, and missing profiles are not cached
+    assert supabase.queries == [["u2", "u3"]]
+    assert "u3" not in auth._profile_cache
+
+
+@pytest.mark.asyncio
+async def test_supabase_failure_only_fails_unserved_users(supabase, redis):
+    redis.values["auth:profile:u1"] = auth.orjson.dumps(_profile("u1"))
+    supabase.error = RuntimeError("supabase down")
+
+    results = await asyncio.gather(
+        auth.fetch_user_profile("u1"),
+        auth.fetch_user_profile("u2"),
+        return_exceptions=True,
+    )
+
+    assert results[0] == _profile("u1")
+    assert isinstance(results[1], RuntimeError)
+    assert "u2" not in auth._profile_cache
+    assert auth._profile_breaker.failures == 1
+
+
+@pytest.mark.asyncio
+async def test_transport_errors_are_retried(supabase, redis):
+    supabase.rows = {"u1": _profile("u1")}
+    supabase.error = [httpx.ConnectError("reset"), None]
+
+    assert await auth.fetch_user_profile("u1") == _profile("u1")
+    assert len(supabase.queries) == 2
+
+
+@pytest.mark.asyncio
+async def test_breaker_opens_then_half_opens(supabase, redis):
+    supabase.error = RuntimeError("supabase down")
+    for user_id in ("u1", "u2"):
+        with pytest.raises(RuntimeError):
+            await auth.fetch_user_profile(user_id)
+
+    # Open: lookups fail fast without querying Supabase
+    with pytest.raises(auth.ProfileLookupUnavailable):
+        await auth.fetch_user_profile("u3")
+    assert len(supabase.queries) == 2
+
+    # Once the cooldown has passed a single probe is let through
+    auth._profile_breaker.opened_at -= auth._profile_breaker.cooldown
+    supabase.error = None
+    supabase.rows = {"u3": _profile("u3")}
+    probe = asyncio.ensure_future(auth.fetch_user_profile("u3"))
+    await asyncio.sleep(0)
+    with pytest.raises(auth.ProfileLookupUnavailable):
+        await auth.fetch_user_profile("u4")
+
+    # A successful probe closes the circuit again
+    assert await probe == _profile("u3")
+    assert auth._profile_breaker.opened_at is None
+    supabase.rows["u4"] = _profile("u4")
+    assert await auth.fetch_user_profile("u4") == _profile("u4")
+
+
+@pytest.mark.asyncio
+async def test_slow_lookup_times_out_to_default_context(supabase, redis, monkeypatch):
+    monkeypatch.setattr(auth, "PROFILE_LOOKUP_TIMEOUT", 0.05)
+    supabase.rows = {"u1": _profile("u1")}
+    supabase.delay = 0.2
+
+    with pytest.raises(TimeoutError):
+        await auth.fetch_user_profile("u1")
+
+    user = await auth._user_from_claims("u1", {"email": "jwt@example.com"})
+    assert user == auth.UserCtx(
+        id="u1", email="jwt@example.com", role="free", subscription_status="none"
+    )
+    await _drain_batches()
+
+
+@pytest.mark.asyncio
+async def test_invalidation_during_batch_rereads_the_user(supabase, redis):
+    supabase.rows = {"u1": _profile("u1", role="free")}
+    supabase.delay = 0.05
+
+    lookup = asyncio.ensure_future(auth.fetch_user_profile("u1"))
+    await asyncio.sleep(0.01)
+    supabase.rows = {"u1": _profile("u1", role="premium")}
+    await auth.invalidate_user("u1")
+
+    assert (await lookup)["role"] == "premium"
+    assert redis.published == [(auth.PROFILE_INVALIDATION_CHANNEL, "u1")]
+    # The superseded lookup is neither cached nor written back to Redis
+    assert "u1" not in auth._profile_cache
+    assert "auth:profile:u1" not in redis.values
@@ -4,10 +4,14 @@ Contains all odds conversions, EV calculations, and fee adjustments
 Source of truth for mathematical operations - eliminates duplication
 """
 import logging
-from typing import Dict, Tuple
+import re
+from typing import Dict, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# First signed integer in an odds string: "+110", "-105", "ProphetX 184 (180)"
+_AMERICAN_ODDS_RE = re.compile(r'[+-]?\d+')
+
 
 class MathUtils:
     """Centralized mathematical operations for betting analysis"""
@@ -85,6 +89,17 @@ class MathUtils:
         probability = MathUtils.american_to_probability(american_odds)
         return MathUtils.probability_to_decimal(probability)
     
+    @staticmethod
+    def parse_american_odds(odds_text: str) -> Optional[int]:
+        """
+        Extract American odds from a display string
+        Returns None instead of raising when no odds are present, so callers
+        parsing decorated strings (book names, parenthetical net odds) never
+        pay for exception handling
+        """
+        match = _AMERICAN_ODDS_RE.search(odds_text)
+        return int(match.group()) if match else None
+    
     @staticmethod
     def remove_vig_two_sided(prob1: float, prob2: float) -> Tuple[float, float]:
         """